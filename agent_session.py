@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from passage_index import estimate_tokens
+from prompt_builder import MESSAGE_OVERHEAD
+
+def message_tokens(messages: List[Dict[str, str]]) -> int:
+    return sum(estimate_tokens(message["content"]) + MESSAGE_OVERHEAD for message in messages)
+
+class SessionHistory:
+    def __init__(self, system_prompt: str, max_tokens: int, pinned_turns: int = 1):
+        self.messages: List[Dict[str, str]] = [{"role": "system", "content": system_prompt}]
+        self.max_tokens = max_tokens
+        self.pinned_turns = pinned_turns
+        self.stats = {"rounds": 0, "trimmed_turns": 0, "prefix_breaks": 0}
+
+    @property
+    def tokens(self) -> int:
+        return message_tokens(self.messages)
+
+    def begin(self, content: str) -> List[Dict[str, str]]:
+        self.messages.append({"role": "user", "content": content})
+        self._fit()
+        return list(self.messages)
+
+    def commit(self, response: str) -> None:
+        self.messages.append({"role": "assistant", "content": response})
+        self.stats["rounds"] += 1
+
+    def rollback(self) -> None:
+        if self.messages[-1]["role"] == "user":
+            self.messages.pop()
+
+    def _fit(self) -> None:
+        start = 1 + 2 * self.pinned_turns
+        while self.tokens > self.max_tokens:
+            turns = (len(self.messages) - 1 - start) // 2
+            if turns <= 0:
+                return
+            drop = max(1, turns // 2)
+            del self.messages[start:start + 2 * drop]
+            self.stats["trimmed_turns"] += drop
+            self.stats["prefix_breaks"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "messages": len(self.messages), "tokens": self.tokens}
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import argparse
+import io
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from embedding_store import EmbeddingStore
+from vector_index import FlatIndex, IVFIndex
+
+def make_vectors(count: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, count)
+    vectors = centers[labels] + 0.6 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def time_queries(index, queries: np.ndarray, top_k: int) -> tuple[list[np.ndarray], float]:
+    results = []
+    start = time.perf_counter()
+    for query in queries:
+        ids, _ = index.search(query, top_k)
+        results.append(ids)
+    elapsed = time.perf_counter() - start
+    return results, elapsed / len(queries) * 1000
+
+def run_benchmark(count: int, dim: int, queries: int, top_k: int, probes: list[int]) -> None:
+    rng = np.random.default_rng(42)
+    vectors = make_vectors(count, dim, clusters=max(8, count // 500), rng=rng)
+    query_vectors = make_vectors(queries, dim, clusters=max(8, count // 500), rng=rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = EmbeddingStore(Path(tmp) / "bench.emb", dim=dim, model_name="benchmark")
+        store.append(vectors)
+
+        flat = FlatIndex(store)
+        truth, flat_ms = time_queries(flat, query_vectors, top_k)
+        print(f"📊 {count} vectors, dim={dim}, top_k={top_k}")
+        print(f"   flat        : {flat_ms:8.3f} ms/query  recall@{top_k}=1.000")
+
+        build_start = time.perf_counter()
+        ivf = IVFIndex(store, Path(tmp) / "bench.idx", min_train=1)
+        build_s = time.perf_counter() - build_start
+        print(f"   ivf build   : {build_s:8.2f} s ({len(ivf.centroids)} lists)")
+
+        for n_probe in probes:
+            ivf.n_probe = n_probe
+            found, ivf_ms = time_queries(ivf, query_vectors, top_k)
+            recall = np.mean([len(np.intersect1d(a, b)) / len(a) for a, b in zip(truth, found)])
+            print(f"   ivf probe={n_probe:<3}: {ivf_ms:8.3f} ms/query  recall@{top_k}={recall:.3f}  speedup={flat_ms / ivf_ms:.1f}x")
+
+        int8_store = EmbeddingStore(Path(tmp) / "bench_int8.emb", dim=dim, model_name="benchmark", storage="int8")
+        int8_store.append(vectors)
+        found, int8_ms = time_queries(FlatIndex(int8_store), query_vectors, top_k)
+        recall = np.mean([len(np.intersect1d(a, b)) / len(a) for a, b in zip(truth, found)])
+        print(f"   flat int8   : {int8_ms:8.3f} ms/query  recall@{top_k}={recall:.3f}  "
+              f"size={int8_store.nbytes / store.nbytes:.2f}x of float32")
+
+def model_size_mb(model) -> float:
+    import torch
+
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / 1024 / 1024
+
+def load_texts(limit: int) -> List[str]:
+    from config import MEMORY_SEGMENT_ENTRIES
+    from passage_index import PASSAGE_FIELDS
+    from conversation_log import ConversationLog
+
+    texts: List[str] = []
+    log_dir = Path("conversation_memory_log")
+    if log_dir.exists():
+        with tempfile.TemporaryDirectory() as tmp:
+            copy_dir = Path(tmp) / "log"
+            shutil.copytree(log_dir, copy_dir, ignore=shutil.ignore_patterns("index"))
+            log = ConversationLog(copy_dir, segment_entries=MEMORY_SEGMENT_ENTRIES, durability="none")
+            for entry in log.iter_entries():
+                texts.extend(entry.get(field, "") for field in ("user",) + PASSAGE_FIELDS)
+            log.close()
+    texts = [text for text in texts if text.strip()]
+
+    if not texts:
+        texts = [
+            "Türkiye'nin yüzölçümü nedir?",
+            "Microservice mimarisinde JWT kullanımı mantıklı mı?",
+            "Python ve JavaScript arasındaki farklar nelerdir?",
+            "İstanbul'un nüfusu kaç kişidir?",
+            "Yapay zeka modelleri nasıl eğitilir?",
+        ]
+    return (texts * (limit // len(texts) + 1))[:limit]
+
+def run_embedding_benchmark(count: int, top_k: int, precisions: List[str]) -> None:
+    from config import EMBEDDING_MODEL
+    from memory_system import EmbeddingBackend
+
+    texts = load_texts(count)
+    queries = texts[::max(1, len(texts) // 50)][:50]
+    reference = None
+    print(f"📊 {len(texts)} texts, model={EMBEDDING_MODEL}")
+
+    for precision in precisions:
+        try:
+            backend = EmbeddingBackend(EMBEDDING_MODEL, precision)
+        except ValueError as e:
+            print(f"   {precision:<8}: atlandı ({e})")
+            continue
+        backend.encode(texts[:8])
+
+        start = time.perf_counter()
+        vectors = backend.encode(texts)
+        elapsed = time.perf_counter() - start
+        query_vectors = backend.encode(queries)
+
+        if reference is None:
+            reference = (vectors, query_vectors)
+        ref_vectors, ref_queries = reference
+
+        agreement = []
+        for query, ref_query in zip(query_vectors, ref_queries):
+            expected = np.argsort(-(ref_vectors @ ref_query))[:top_k]
+            found = np.argsort(-(vectors @ query))[:top_k]
+            agreement.append(len(np.intersect1d(expected, found)) / top_k)
+        cosine = float(np.mean(np.sum(vectors * ref_vectors, axis=1)))
+
+        print(f"   {precision:<8}: {len(texts) / elapsed:8.1f} texts/s  model={model_size_mb(backend.model):7.1f} MB  "
+              f"top{top_k} agreement={np.mean(agreement):.3f}  cosine to {precisions[0]}={cosine:.4f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory index and embedding backend benchmark")
+    parser.add_argument("--mode", choices=["index", "embeddings"], default="index")
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--probes", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--precisions", nargs="+", default=["float32", "int8"])
+    args = parser.parse_args()
+
+    if args.mode == "embeddings":
+        run_embedding_benchmark(min(args.count, 2000), args.top_k, args.precisions)
+    else:
+        run_benchmark(args.count, args.dim, args.queries, args.top_k, args.probes)
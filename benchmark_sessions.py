@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+from typing import Any, Dict, List
+
+from config import MODEL_LLAMA, MODEL_GEMMA
+from multi_agent_streaming import LocalAgent, call_ollama_stream, shutdown_services
+
+QWEN_SYSTEM = "Sen akıllı bir analiz asistanısın.\nİlk 3 turda farklı perspektifler sun.\nSonra sentez yap.\nKısa ve net ol.\nCevabını Türkçe ver."
+GEMMA_SYSTEM = "Sen eleştirel düşünce asistanısın.\nAlternatif görüşler sun.\nQwen'in görüşüne ne kadar katıldığını (Haklılık Payı: %X) belirt.\nKısa ve net ol.\nCevabını Türkçe ver."
+
+async def stateless_turn(agent: LocalAgent, prompt: str, temp: float) -> tuple[str, Dict[str, Any]]:
+    messages = [
+        {"role": "system", "content": agent.system_prompt},
+        {"role": "user", "content": prompt}
+    ]
+    metrics: Dict[str, Any] = {}
+    text = ""
+    async for chunk in call_ollama_stream(agent.model_name, messages, temp, metrics=metrics):
+        text += chunk
+    return text, metrics
+
+async def session_turn(session, prompt: str, temp: float) -> tuple[str, Dict[str, Any]]:
+    text = ""
+    async for chunk in session.think_stream(prompt, temp_override=temp):
+        text += chunk
+    return text, session.rounds[-1] if session.rounds else {}
+
+async def run_mode(mode: str, question: str, rounds: int, temp: float) -> List[Dict[str, Any]]:
+    qwen = LocalAgent("Qwen", MODEL_LLAMA, QWEN_SYSTEM)
+    gemma = LocalAgent("Gemma", MODEL_GEMMA, GEMMA_SYSTEM)
+    sessions = {agent.name: agent.session() for agent in (qwen, gemma)}
+
+    async def turn(agent: LocalAgent, prompt: str) -> tuple[str, Dict[str, Any]]:
+        if mode == "session":
+            return await session_turn(sessions[agent.name], prompt, temp)
+        return await stateless_turn(agent, prompt, temp)
+
+    rows = []
+    gemma_last = ""
+    for round_count in range(1, rounds + 1):
+        if round_count == 1:
+            qwen_prompt = f"Soru: {question}\n\nBu konuyu analiz et."
+        else:
+            qwen_prompt = f"Önceki: {gemma_last}\n\nEleştir ve sentezle."
+        qwen_text, qwen_metrics = await turn(qwen, qwen_prompt)
+
+        gemma_prompt = f"Görüş: {qwen_text}\n\nAlternatif bakış sun ve Qwen'in bu turdaki doğruluk/haklılık payını (% olarak) metin içinde geçir."
+        gemma_last, gemma_metrics = await turn(gemma, gemma_prompt)
+
+        for name, metrics in (("Qwen", qwen_metrics), ("Gemma", gemma_metrics)):
+            rows.append({
+                "mode": mode,
+                "round": round_count,
+                "agent": name,
+                "prompt_tokens": metrics.get("prompt_eval_count", 0),
+                "prefill_ms": metrics.get("prompt_eval_duration", 0) / 1e6,
+                "decode_tps": metrics.get("eval_count", 0) / (metrics.get("eval_duration", 0) / 1e9 or float("inf"))
+            })
+    return rows
+
+async def run_benchmark(question: str, rounds: int, modes: List[str], temp: float) -> None:
+    try:
+        for agent_model in (MODEL_LLAMA, MODEL_GEMMA):
+            async for _ in call_ollama_stream(agent_model, [{"role": "user", "content": "merhaba"}]):
+                pass
+
+        totals = {}
+        print(f"📊 {rounds} tur, soru: {question}")
+        print(f"   {'mode':<10}{'round':>6}  {'agent':<6}{'prefill tok':>12}{'prefill ms':>12}{'decode tok/s':>14}")
+        for mode in modes:
+            rows = await run_mode(mode, question, rounds, temp)
+            for row in rows:
+                print(f"   {row['mode']:<10}{row['round']:>6}  {row['agent']:<6}{row['prompt_tokens']:>12}"
+                      f"{row['prefill_ms']:>12.1f}{row['decode_tps']:>14.1f}")
+            later = [row for row in rows if row["round"] > 1]
+            totals[mode] = (sum(row["prefill_ms"] for row in rows), sum(row["prefill_ms"] for row in later),
+                            sum(row["prompt_tokens"] for row in later))
+
+        for mode, (total_ms, later_ms, later_tokens) in totals.items():
+            print(f"   {mode:<10}: toplam prefill {total_ms:9.1f} ms  tur>1 prefill {later_ms:9.1f} ms  tur>1 token {later_tokens}")
+    finally:
+        await shutdown_services()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prefill time per round: stateless prompts vs session history")
+    parser.add_argument("--question", default="Yapay zeka eğitimde öğretmenlerin rolünü nasıl değiştirir?")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--modes", nargs="+", choices=["stateless", "session"], default=["stateless", "session"])
+    parser.add_argument("--temperature", type=float, default=0.8)
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args.question, args.rounds, args.modes, args.temperature))
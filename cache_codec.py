@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+import struct
+import threading
+import zlib
+from typing import Any, Dict, Union
+
+MAGIC = b"\xa7TC"
+VERSION = 1
+FLAG_ZLIB = 0x01
+HEADER = struct.Struct("<3sBB")
+REF_KEY = "\x00ref"
+
+def dedupe_fields(value: Any, min_length: int = 64) -> Any:
+    if isinstance(value, list):
+        return [dedupe_fields(item, min_length) for item in value]
+    if not isinstance(value, dict):
+        return value
+
+    seen: Dict[str, str] = {}
+    result = {}
+    for key, item in value.items():
+        if isinstance(item, str) and len(item) >= min_length:
+            if item in seen:
+                result[key] = {REF_KEY: seen[item]}
+                continue
+            seen[item] = key
+        result[key] = dedupe_fields(item, min_length)
+    return result
+
+def restore_fields(value: Any) -> Any:
+    if isinstance(value, list):
+        return [restore_fields(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+
+    result = {key: restore_fields(item) for key, item in value.items()}
+    for key, item in result.items():
+        if isinstance(item, dict) and len(item) == 1 and REF_KEY in item:
+            result[key] = result[item[REF_KEY]]
+    return result
+
+class CacheCodec:
+    def __init__(self, compress_threshold: int = 512, level: int = 6):
+        self.compress_threshold = compress_threshold
+        self.level = level
+        self._lock = threading.Lock()
+        self.stats = {"encoded": 0, "compressed": 0, "decoded": 0, "legacy_decoded": 0,
+                      "raw_bytes": 0, "stored_bytes": 0}
+
+    def encode(self, value: Any) -> bytes:
+        body = json.dumps(dedupe_fields(value), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        flags = 0
+        if len(body) >= self.compress_threshold:
+            compressed = zlib.compress(body, self.level)
+            if len(compressed) < len(body):
+                body = compressed
+                flags |= FLAG_ZLIB
+
+        payload = HEADER.pack(MAGIC, VERSION, flags) + body
+        raw_size = len(json.dumps(value).encode("utf-8"))
+        with self._lock:
+            self.stats["encoded"] += 1
+            self.stats["compressed"] += bool(flags & FLAG_ZLIB)
+            self.stats["raw_bytes"] += raw_size
+            self.stats["stored_bytes"] += len(payload)
+        return payload
+
+    def decode(self, payload: Union[bytes, str]) -> Any:
+        if isinstance(payload, str) or not payload.startswith(MAGIC):
+            self.stats["legacy_decoded"] += 1
+            return json.loads(payload)
+
+        _, version, flags = HEADER.unpack_from(payload)
+        if version != VERSION:
+            raise ValueError(f"Unsupported cache format version: {version}")
+
+        body = payload[HEADER.size:]
+        if flags & FLAG_ZLIB:
+            body = zlib.decompress(body)
+        self.stats["decoded"] += 1
+        return restore_fields(json.loads(body))
+
+    def get_stats(self) -> Dict[str, Any]:
+        raw = self.stats["raw_bytes"]
+        saved = raw - self.stats["stored_bytes"]
+        return {
+            **self.stats,
+            "bytes_saved": saved,
+            "saved_ratio": round(saved / raw * 100, 1) if raw else 0.0
+        }
@@ -1,16 +1,101 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
-import json
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 import redis
+import redis.asyncio as redis_async
+
+from config import (
+    FILE_CACHE_MAX_ENTRIES, FILE_CACHE_SWEEP_INTERVAL, CACHE_MEMORY_MAX_ENTRIES,
+    CACHE_REDIS_POOL_SIZE, CACHE_REDIS_TIMEOUT, CACHE_COMPRESS_THRESHOLD, CACHE_COMPRESS_LEVEL
+)
+from cache_codec import CacheCodec
+from file_cache import SQLiteCache
+
+class TierStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.total_latency = 0.0
+    
+    def record(self, hit: bool, started: float) -> None:
+        self.add(int(hit), int(not hit), time.perf_counter() - started)
+    
+    def add(self, hits: int, misses: int, elapsed: float) -> None:
+        self.hits += hits
+        self.misses += misses
+        self.total_latency += elapsed
+    
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0,
+            "avg_latency_ms": round(self.total_latency / lookups * 1000, 3) if lookups else 0.0
+        }
+
+def is_fresh(data: Dict[str, Any], now: Optional[float] = None) -> bool:
+    return (now or time.time()) - data["timestamp"] < data["ttl"]
+
+def is_alive(data: Dict[str, Any], now: Optional[float] = None) -> bool:
+    return (now or time.time()) - data["timestamp"] < data["ttl"] + data.get("stale", 0)
+
+class MemoryLRU:
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                return None
+            if not is_alive(data):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return {**data, "response": dict(data["response"])}
+    
+    def set(self, key: str, data: Dict[str, Any]) -> None:
+        if self.max_entries <= 0 or not is_alive(data):
+            return
+        with self._lock:
+            self._entries[key] = {**data, "response": dict(data["response"])}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
 
 class CacheManager:
     def __init__(self, use_redis: bool = True, redis_host: str = "redis", redis_port: int = 6379):
         self.use_redis = use_redis
+        self.memory_cache = MemoryLRU(CACHE_MEMORY_MAX_ENTRIES)
+        self.tier_stats = {"memory": TierStats(), "backend": TierStats()}
+        self.codec = CacheCodec(CACHE_COMPRESS_THRESHOLD, CACHE_COMPRESS_LEVEL)
+        self.redis_host = redis_host
+        self.redis_port = redis_port
+        self._async_client: Optional[redis_async.Redis] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.redis_client: Optional[redis.Redis] = None
+        self.file_cache: Optional[SQLiteCache] = None
         
         if use_redis:
             try:
@@ -18,7 +103,7 @@ class CacheManager:
                     host=redis_host,
                     port=redis_port,
                     db=0,
-                    decode_responses=True,
+                    decode_responses=False,
                     socket_connect_timeout=5
                 )
                 self.redis_client.ping()
@@ -33,86 +118,265 @@ class CacheManager:
     def _init_file_cache(self):
         self.cache_dir = Path("cache_data")
         self.cache_dir.mkdir(exist_ok=True)
-        self.cache_file = self.cache_dir / "query_cache.json"
+        self.file_cache = SQLiteCache(
+            self.cache_dir / "query_cache.sqlite",
+            max_entries=FILE_CACHE_MAX_ENTRIES,
+            sweep_interval=FILE_CACHE_SWEEP_INTERVAL,
+            codec=self.codec
+        )
         
-        if self.cache_file.exists():
+        legacy_file = self.cache_dir / "query_cache.json"
+        if legacy_file.exists() and len(self.file_cache) == 0:
             try:
-                with open(self.cache_file, "r", encoding="utf-8") as f:
-                    self.file_cache = json.load(f)
+                self.file_cache.import_json(legacy_file)
             except:
-                self.file_cache = {}
-        else:
-            self.file_cache = {}
+                pass
     
     def _generate_key(self, query: str, model_name: str) -> str:
         combined = f"{model_name}:{query.strip().lower()}"
         return hashlib.sha256(combined.encode()).hexdigest()
     
-    def get(self, query: str, model_name: str) -> Optional[Dict[str, Any]]:
-        key = self._generate_key(query, model_name)
-        
+    def _backend_get(self, key: str) -> Optional[Dict[str, Any]]:
         if self.use_redis:
             try:
                 cached = self.redis_client.get(key)
                 if cached:
-                    data = json.loads(cached)
-                    if time.time() - data["timestamp"] < data["ttl"]:
-                        return data["response"]
+                    data = self.codec.decode(cached)
+                    if is_alive(data):
+                        return data
                     else:
                         self.redis_client.delete(key)
                         return None
             except:
                 return None
         else:
-            if key in self.file_cache:
-                data = self.file_cache[key]
-                if time.time() - data["timestamp"] < data["ttl"]:
-                    return data["response"]
-                else:
-                    del self.file_cache[key]
-                    self._save_file_cache()
-                    return None
+            try:
+                return self.file_cache.get(key)
+            except:
+                return None
         
         return None
     
-    def set(self, query: str, model_name: str, response: Dict[str, Any], ttl: int = 3600):
-        key = self._generate_key(query, model_name)
+    def _get_entry(self, key: str, allow_stale: bool) -> Optional[Dict[str, Any]]:
+        started = time.perf_counter()
+        data = self.memory_cache.get(key)
+        if data is not None and not (allow_stale or is_fresh(data)):
+            data = None
+        self.tier_stats["memory"].record(data is not None, started)
+        if data is not None:
+            return data
         
-        cache_data = {
+        started = time.perf_counter()
+        data = self._backend_get(key)
+        if data is not None:
+            self.memory_cache.set(key, data)
+            if not (allow_stale or is_fresh(data)):
+                data = None
+        self.tier_stats["backend"].record(data is not None, started)
+        return data
+    
+    def get(self, query: str, model_name: str) -> Optional[Dict[str, Any]]:
+        data = self._get_entry(self._generate_key(query, model_name), allow_stale=False)
+        return data["response"] if data else None
+    
+    def get_swr(self, query: str, model_name: str) -> tuple[Optional[Dict[str, Any]], bool]:
+        data = self._get_entry(self._generate_key(query, model_name), allow_stale=True)
+        if data is None:
+            return None, False
+        return data["response"], not is_fresh(data)
+    
+    def _entry(self, response: Dict[str, Any], ttl: int, stale: int) -> Dict[str, Any]:
+        return {
             "response": response,
             "timestamp": time.time(),
-            "ttl": ttl
+            "ttl": ttl,
+            "stale": stale
         }
+    
+    def set(self, query: str, model_name: str, response: Dict[str, Any], ttl: int = 3600, stale: int = 0):
+        key = self._generate_key(query, model_name)
+        
+        cache_data = self._entry(response, ttl, stale)
+        self.memory_cache.set(key, cache_data)
         
         if self.use_redis:
             try:
                 self.redis_client.setex(
                     key,
-                    ttl,
-                    json.dumps(cache_data)
+                    ttl + stale,
+                    self.codec.encode(cache_data)
                 )
             except:
                 pass
         else:
-            self.file_cache[key] = cache_data
-            self._save_file_cache()
-    
-    def _save_file_cache(self):
-        try:
-            with open(self.cache_file, "w", encoding="utf-8") as f:
-                json.dump(self.file_cache, f, ensure_ascii=False, indent=2)
-        except:
-            pass
+            try:
+                self.file_cache.set(key, response, ttl, stale)
+            except:
+                pass
     
     def clear(self):
+        self.memory_cache.clear()
         if self.use_redis:
             try:
                 self.redis_client.flushdb()
             except:
                 pass
         else:
-            self.file_cache = {}
-            self._save_file_cache()
+            try:
+                self.file_cache.clear()
+            except:
+                pass
+    
+    def _discard_async_client(self) -> None:
+        client, loop = self._async_client, self._async_loop
+        self._async_client = None
+        self._async_loop = None
+        if client is not None and loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+    
+    def _async_redis(self) -> redis_async.Redis:
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._discard_async_client()
+            pool = redis_async.ConnectionPool(
+                host=self.redis_host,
+                port=self.redis_port,
+                db=0,
+                decode_responses=False,
+                max_connections=CACHE_REDIS_POOL_SIZE,
+                socket_timeout=CACHE_REDIS_TIMEOUT,
+                socket_connect_timeout=CACHE_REDIS_TIMEOUT
+            )
+            self._async_client = redis_async.Redis(connection_pool=pool)
+            self._async_loop = loop
+        return self._async_client
+    
+    async def _abackend_get_many(self, keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+        if not self.use_redis:
+            return await asyncio.to_thread(lambda: [self._backend_get(key) for key in keys])
+        
+        try:
+            values = await self._async_redis().mget(keys)
+        except Exception:
+            return [None] * len(keys)
+        
+        now = time.time()
+        found: List[Optional[Dict[str, Any]]] = []
+        for cached in values:
+            data = self.codec.decode(cached) if cached else None
+            found.append(data if data and is_alive(data, now) else None)
+        return found
+    
+    async def _aget_entries(self, keys: List[str], allow_stale: bool) -> List[Optional[Dict[str, Any]]]:
+        results: List[Optional[Dict[str, Any]]] = [None] * len(keys)
+        missing: List[int] = []
+        
+        for i, key in enumerate(keys):
+            started = time.perf_counter()
+            data = self.memory_cache.get(key)
+            if data is not None and (allow_stale or is_fresh(data)):
+                results[i] = data
+            self.tier_stats["memory"].record(results[i] is not None, started)
+            if results[i] is None:
+                missing.append(i)
+        
+        if missing:
+            started = time.perf_counter()
+            found = await self._abackend_get_many([keys[i] for i in missing])
+            hits = 0
+            for i, data in zip(missing, found):
+                if data is None:
+                    continue
+                self.memory_cache.set(keys[i], data)
+                if allow_stale or is_fresh(data):
+                    results[i] = data
+                    hits += 1
+            self.tier_stats["backend"].add(hits, len(found) - hits, time.perf_counter() - started)
+        
+        return results
+    
+    async def aget_many(self, queries: List[str], model_name: str) -> List[Optional[Dict[str, Any]]]:
+        keys = [self._generate_key(query, model_name) for query in queries]
+        return [data["response"] if data else None for data in await self._aget_entries(keys, allow_stale=False)]
+    
+    async def aget(self, query: str, model_name: str) -> Optional[Dict[str, Any]]:
+        return (await self.aget_many([query], model_name))[0]
+    
+    async def aget_swr(self, query: str, model_name: str) -> tuple[Optional[Dict[str, Any]], bool]:
+        data = (await self._aget_entries([self._generate_key(query, model_name)], allow_stale=True))[0]
+        if data is None:
+            return None, False
+        return data["response"], not is_fresh(data)
+    
+    async def aset_many(self, items: List[tuple[str, Dict[str, Any]]], model_name: str, ttl: int = 3600,
+                        stale: int = 0):
+        entries = [(self._generate_key(query, model_name), self._entry(response, ttl, stale)) for query, response in items]
+        for key, cache_data in entries:
+            self.memory_cache.set(key, cache_data)
+        
+        if self.use_redis:
+            try:
+                async with self._async_redis().pipeline(transaction=False) as pipe:
+                    for key, cache_data in entries:
+                        pipe.setex(key, ttl + stale, self.codec.encode(cache_data))
+                    await pipe.execute()
+            except Exception:
+                pass
+        else:
+            def write():
+                for key, cache_data in entries:
+                    self.file_cache.set(key, cache_data["response"], ttl, stale)
+            try:
+                await asyncio.to_thread(write)
+            except:
+                pass
+    
+    async def aset(self, query: str, model_name: str, response: Dict[str, Any], ttl: int = 3600, stale: int = 0):
+        await self.aset_many([(query, response)], model_name, ttl, stale)
+    
+    async def aclear(self):
+        self.memory_cache.clear()
+        if self.use_redis:
+            try:
+                await self._async_redis().flushdb()
+            except Exception:
+                pass
+        else:
+            try:
+                await asyncio.to_thread(self.file_cache.clear)
+            except:
+                pass
+    
+    async def aclose(self):
+        if self._async_client is not None and self._async_loop is asyncio.get_running_loop():
+            await self._async_client.aclose()
+            self._async_client = None
+            self._async_loop = None
+        self._discard_async_client()
+        self.close()
+    
+    def close(self):
+        if self.redis_client is not None:
+            self.redis_client.close()
+        if self.file_cache is not None:
+            self.file_cache.close()
+    
+    def _tier_stats(self) -> Dict[str, Any]:
+        memory = self.tier_stats["memory"]
+        backend = self.tier_stats["backend"]
+        lookups = memory.hits + memory.misses
+        hits = memory.hits + backend.hits
+        return {
+            "hits": hits,
+            "misses": backend.misses,
+            "hit_rate": round(hits / lookups * 100, 1) if lookups else 0.0,
+            "encoding": self.codec.get_stats(),
+            "tiers": {
+                "memory": {**memory.as_dict(), "entries": len(self.memory_cache),
+                           "max_entries": self.memory_cache.max_entries},
+                "redis" if self.use_redis else "file": backend.as_dict()
+            }
+        }
     
     def get_stats(self) -> Dict[str, Any]:
         if self.use_redis:
@@ -122,25 +386,14 @@ class CacheManager:
                     "type": "redis",
                     "total_keys": self.redis_client.dbsize(),
                     "memory_used": info.get("used_memory_human", "N/A"),
-                    "hits": info.get("keyspace_hits", 0),
-                    "misses": info.get("keyspace_misses", 0)
+                    "keyspace_hits": info.get("keyspace_hits", 0),
+                    "keyspace_misses": info.get("keyspace_misses", 0),
+                    **self._tier_stats()
                 }
             except:
-                return {"type": "redis", "status": "error"}
+                return {"type": "redis", "status": "error", **self._tier_stats()}
         else:
-            valid_keys = 0
-            expired_keys = 0
-            current_time = time.time()
-            
-            for data in self.file_cache.values():
-                if current_time - data["timestamp"] < data["ttl"]:
-                    valid_keys += 1
-                else:
-                    expired_keys += 1
-            
-            return {
-                "type": "file",
-                "total_keys": len(self.file_cache),
-                "valid_keys": valid_keys,
-                "expired_keys": expired_keys
-            }
\ No newline at end of file
+            try:
+                return {"type": "file", **self.file_cache.get_stats(), **self._tier_stats()}
+            except:
+                return {"type": "file", "status": "error", **self._tier_stats()}
@@ -7,11 +7,81 @@ DEBUG = False
 SHOW_RESPONSE_TIMES = True
 
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434/api/chat")
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "8"))
+OLLAMA_KEEPALIVE_CONNECTIONS = 8
+OLLAMA_KEEPALIVE_EXPIRY = 300.0
+OLLAMA_CONNECT_TIMEOUT = 5.0
+OLLAMA_FIRST_TOKEN_TIMEOUT = 120.0
+OLLAMA_IDLE_TIMEOUT = 30.0
+OLLAMA_REQUEST_TIMEOUT = 300.0
+OLLAMA_ENDPOINTS = [url.strip() for url in os.getenv("OLLAMA_ENDPOINTS", OLLAMA_BASE_URL).split(",") if url.strip()]
+OLLAMA_MODEL_ENDPOINTS = os.getenv("OLLAMA_MODEL_ENDPOINTS", "")
+OLLAMA_HEALTH_INTERVAL = 15.0
+OLLAMA_PROBE_TIMEOUT = 2.0
+OLLAMA_RETRY_AFTER = 10.0
+MODEL_SCHEDULER_ENABLED = os.getenv("MODEL_SCHEDULER_ENABLED", "true").lower() == "true"
+MODEL_SCHEDULER_CONCURRENCY = int(os.getenv("MODEL_SCHEDULER_CONCURRENCY", "2"))
+MODEL_SCHEDULER_MAX_WAIT = float(os.getenv("MODEL_SCHEDULER_MAX_WAIT", "5.0"))
+GENERATION_POLICY = os.getenv("GENERATION_POLICY", "fixed")
+GENERATION_MAX_ACTIVE = int(os.getenv("GENERATION_MAX_ACTIVE", "2"))
+GENERATION_STATS_PATH = os.getenv("GENERATION_STATS_PATH", "cache_data/generation_stats.json")
+PROMPT_MAX_CTX = int(os.getenv("PROMPT_MAX_CTX", "8192"))
+PROMPT_NUM_PREDICT = 500
+PROMPT_MIN_PREDICT = 128
+PROMPT_CTX_HEADROOM = 256
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+THINK_SESSION_MODE = os.getenv("THINK_SESSION_MODE", "false").lower() == "true"
 
 MODEL_LLAMA = "qwen2.5:7b"
 MODEL_GEMMA = "gemma2:9b"
+EMBEDDING_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"
+EMBEDDING_PRECISION = os.getenv("EMBEDDING_PRECISION", "float32")
+EMBEDDING_STORAGE = os.getenv("EMBEDDING_STORAGE", "float32")
+
+MEMORY_INDEX = os.getenv("MEMORY_INDEX", "ivf")
+MEMORY_IVF_PROBES = 16
+MEMORY_SEGMENT_ENTRIES = 1000
+MEMORY_HOT_SEGMENTS = 2
+MEMORY_DURABILITY = os.getenv("MEMORY_DURABILITY", "flush")
+MEMORY_FLUSH_INTERVAL = 0.05
+MEMORY_WRITE_QUEUE = 1024
+MEMORY_RETRIEVAL = os.getenv("MEMORY_RETRIEVAL", "hybrid")
+MEMORY_HYBRID_ALPHA = 0.6
+MEMORY_LEXICAL_MIN = 0.35
+MEMORY_LEXICAL_SHORTCUT = 0.8
+MEMORY_PASSAGE_WORDS = 60
+MEMORY_CONTEXT_TOKENS = 400
+EMBEDDING_CACHE_MEMORY_ITEMS = 4096
+EMBEDDING_CACHE_DISK_ITEMS = 200_000
 
 CACHE_ENABLED = True
 CACHE_TTL = 3600
+CACHE_STALE_TTL = int(os.getenv("CACHE_STALE_TTL", "86400"))
+STAGE_CACHE_MODEL_TTL = 86400
+SEARCH_PROVIDER = os.getenv("SEARCH_PROVIDER", "duckduckgo")
+SEARCH_FAKE_RESULTS = os.getenv("SEARCH_FAKE_RESULTS")
+SEARCH_CACHE_ENABLED = True
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "3600"))
+SEARCH_CACHE_NEGATIVE_TTL = 300
+SEARCH_CACHE_MAX_ENTRIES = 5000
+SEARCH_CONTEXT_TOKENS = int(os.getenv("SEARCH_CONTEXT_TOKENS", "600"))
+SEARCH_DEDUPE_THRESHOLD = 0.5
+SEARCH_MINHASH_PERMUTATIONS = 64
+THINK_SEARCH_TOKENS = 160
+CONTEXT_WORKERS = 4
+CONTEXT_SEARCH_WORKERS = 4
+CONTEXT_MEMORY_TIMEOUT = float(os.getenv("CONTEXT_MEMORY_TIMEOUT", "2.0"))
+CONTEXT_SEARCH_TIMEOUT = float(os.getenv("CONTEXT_SEARCH_TIMEOUT", "6.0"))
+FILE_CACHE_MAX_ENTRIES = 10000
+FILE_CACHE_SWEEP_INTERVAL = 60
+CACHE_MEMORY_MAX_ENTRIES = 512
+CACHE_REDIS_POOL_SIZE = 32
+CACHE_REDIS_TIMEOUT = 0.5
+CACHE_COMPRESS_THRESHOLD = 512
+CACHE_COMPRESS_LEVEL = 6
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEMANTIC_CACHE_TTL = 3600
+SEMANTIC_CACHE_MAX_ENTRIES = 5000
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
 REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
\ No newline at end of file
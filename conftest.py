@@ -0,0 +1 @@
+collect_ignore = ["test_security.py", "venv"]
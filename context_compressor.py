@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from lexical_index import tokenize
+from passage_index import estimate_tokens
+from prompt_builder import trim_to_tokens
+
+MIN_SNIPPET_TOKENS = 32
+SNIPPET_OVERHEAD = 2
+
+def shingles(text: str, size: int = 3) -> set[int]:
+    tokens = tokenize(text)
+    grams = [" ".join(tokens[i:i + size]) for i in range(max(1, len(tokens) - size + 1))] if tokens else []
+    return {int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "little") for gram in grams}
+
+def mix64(values: np.ndarray) -> np.ndarray:
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+class MinHasher:
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.seeds = rng.integers(0, np.iinfo(np.uint64).max, num_perm, dtype=np.uint64, endpoint=True)
+
+    def signature(self, hashes: set[int]) -> Optional[np.ndarray]:
+        if not hashes:
+            return None
+        values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+        return mix64(values[:, None] ^ self.seeds).min(axis=0)
+
+    @staticmethod
+    def similarity(left: Optional[np.ndarray], right: Optional[np.ndarray]) -> float:
+        if left is None or right is None:
+            return 0.0
+        return float(np.mean(left == right))
+
+def rank_scores(query: str, texts: List[str], k1: float = 1.5, b: float = 0.75) -> List[float]:
+    docs = [Counter(tokenize(text)) for text in texts]
+    terms = set(tokenize(query))
+    if not docs or not terms:
+        return [0.0] * len(texts)
+
+    lengths = [sum(doc.values()) for doc in docs]
+    avg_length = sum(lengths) / len(lengths) or 1.0
+    scores = [0.0] * len(docs)
+    for term in terms:
+        df = sum(1 for doc in docs if term in doc)
+        if df == 0:
+            continue
+        idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+        for i, doc in enumerate(docs):
+            tf = doc.get(term, 0)
+            if tf:
+                scores[i] += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * lengths[i] / avg_length))
+    return scores
+
+def format_snippet(snippet: Dict[str, str]) -> str:
+    return f"[{snippet['title']}]\n{snippet['body']}"
+
+class ContextCompressor:
+    def __init__(self, max_tokens: int = 600, threshold: float = 0.5, num_perm: int = 64, shingle_size: int = 3):
+        self.max_tokens = max_tokens
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.hasher = MinHasher(num_perm)
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "snippets": 0, "duplicates": 0, "dropped": 0, "trimmed": 0,
+                      "tokens_in": 0, "tokens_out": 0}
+
+    def compress(self, query: str, snippets: List[Dict[str, str]], max_results: Optional[int] = None,
+                 max_tokens: Optional[int] = None) -> List[Dict[str, str]]:
+        texts = [f"{snippet['title']} {snippet['body']}" for snippet in snippets]
+        signatures = [self.hasher.signature(shingles(text, self.shingle_size)) for text in texts]
+        scores = rank_scores(query, texts)
+        order = sorted(range(len(snippets)), key=lambda i: (-scores[i], i))
+
+        kept: List[int] = []
+        duplicates = 0
+        for i in order:
+            if any(MinHasher.similarity(signatures[i], signatures[j]) >= self.threshold for j in kept):
+                duplicates += 1
+                continue
+            kept.append(i)
+
+        limit = len(kept) if max_results is None else min(len(kept), max_results)
+        candidates = kept[:limit]
+        remaining = max_tokens or self.max_tokens
+        selected: List[Dict[str, str]] = []
+        trimmed = 0
+        for n, i in enumerate(candidates):
+            if remaining < MIN_SNIPPET_TOKENS:
+                break
+            share = remaining // (len(candidates) - n)
+            snippet = snippets[i]
+            cost = estimate_tokens(format_snippet(snippet)) + SNIPPET_OVERHEAD
+            if cost > share:
+                header = estimate_tokens(format_snippet({**snippet, "body": ""}))
+                body_budget = min(remaining, max(share, 2 * MIN_SNIPPET_TOKENS)) - header - SNIPPET_OVERHEAD - 1
+                if body_budget < MIN_SNIPPET_TOKENS:
+                    continue
+                body = trim_to_tokens(snippet["body"], body_budget)
+                if body != snippet["body"]:
+                    snippet = {**snippet, "body": body}
+                    cost = estimate_tokens(format_snippet(snippet)) + SNIPPET_OVERHEAD
+                    trimmed += 1
+            selected.append(snippet)
+            remaining -= cost
+        dropped = len(kept) - len(selected)
+
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["snippets"] += len(snippets)
+            self.stats["duplicates"] += duplicates
+            self.stats["dropped"] += dropped
+            self.stats["trimmed"] += trimmed
+            self.stats["tokens_in"] += sum(estimate_tokens(format_snippet(snippet)) for snippet in snippets)
+            self.stats["tokens_out"] += sum(estimate_tokens(format_snippet(snippet)) for snippet in selected)
+
+        return selected
+
+    def get_stats(self) -> Dict[str, Any]:
+        tokens_in = self.stats["tokens_in"]
+        return {
+            **self.stats,
+            "compression": round(1 - self.stats["tokens_out"] / tokens_in, 3) if tokens_in else 0.0
+        }
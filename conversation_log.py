@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+OFFSET = struct.Struct("<Q")
+ARCHIVE_RECORD = struct.Struct("<QQ")
+SEGMENT_PATTERN = re.compile(r"^seg_(\d{6})\.(jsonl|arc)$")
+DURABILITY_MODES = ("none", "flush", "fsync")
+
+class ConversationLog:
+    def __init__(self, directory: Path, segment_entries: int = 1000, hot_segments: int = 2, durability: str = "flush"):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_entries = segment_entries
+        self.hot_segments = hot_segments
+        self.durability = durability
+
+        self._lock = threading.Lock()
+        self._archived: set[int] = set()
+        self._compaction_thread: Optional[threading.Thread] = None
+        self.active_segment = 0
+        self.active_count = 0
+        self._data_file = None
+        self._index_file = None
+        self._dirty = False
+
+        self._scan()
+        self._open_active()
+
+    def _data_path(self, segment: int) -> Path:
+        return self.directory / f"seg_{segment:06d}.jsonl"
+
+    def _index_path(self, segment: int) -> Path:
+        return self.directory / f"seg_{segment:06d}.idx"
+
+    def _archive_path(self, segment: int) -> Path:
+        return self.directory / f"seg_{segment:06d}.arc"
+
+    def _archive_index_path(self, segment: int) -> Path:
+        return self.directory / f"seg_{segment:06d}.arc.idx"
+
+    def _scan(self) -> None:
+        plain: set[int] = set()
+        for path in self.directory.iterdir():
+            match = SEGMENT_PATTERN.match(path.name)
+            if not match:
+                continue
+            segment = int(match.group(1))
+            if match.group(2) == "arc":
+                if self._archive_index_path(segment).exists():
+                    self._archived.add(segment)
+            else:
+                plain.add(segment)
+
+        for segment in plain & self._archived:
+            self._drop_plain(segment)
+        plain -= self._archived
+
+        segments = plain | self._archived
+        self.active_segment = max(segments) if segments else 0
+        if self.active_segment in self._archived:
+            self.active_segment += 1
+        self.active_count = self._recover_active()
+
+    def _drop_plain(self, segment: int) -> None:
+        for path in (self._data_path(segment), self._index_path(segment)):
+            if path.exists():
+                path.unlink()
+
+    def _recover_active(self) -> int:
+        data_path = self._data_path(self.active_segment)
+        index_path = self._index_path(self.active_segment)
+        if not data_path.exists():
+            data_path.touch()
+            index_path.write_bytes(b"")
+            return 0
+
+        offsets: List[int] = []
+        if index_path.exists():
+            raw = index_path.read_bytes()
+            offsets = [OFFSET.unpack_from(raw, i)[0] for i in range(0, len(raw) - len(raw) % OFFSET.size, OFFSET.size)]
+
+        data_size = data_path.stat().st_size
+        while offsets and offsets[-1] >= data_size:
+            offsets.pop()
+
+        position = offsets.pop() if offsets else 0
+        with data_path.open("r+b") as f:
+            f.seek(position)
+            while True:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    break
+                offsets.append(position)
+                position += len(line)
+            f.truncate(position)
+
+        with index_path.open("wb") as f:
+            f.write(b"".join(OFFSET.pack(o) for o in offsets))
+        return len(offsets)
+
+    def __len__(self) -> int:
+        return self.active_segment * self.segment_entries + self.active_count
+
+    def _open_active(self) -> None:
+        self._close_active()
+        self._data_file = self._data_path(self.active_segment).open("ab")
+        self._index_file = self._index_path(self.active_segment).open("ab")
+
+    def _close_active(self) -> None:
+        for f in (self._data_file, self._index_file):
+            if f is not None:
+                f.close()
+        self._data_file = None
+        self._index_file = None
+
+    def _sync(self) -> None:
+        if self.durability == "none":
+            self._dirty = True
+            return
+
+        self._data_file.flush()
+        self._index_file.flush()
+        if self.durability == "fsync":
+            os.fsync(self._data_file.fileno())
+            os.fsync(self._index_file.fileno())
+
+    def _flush_for_read(self, segment: int) -> None:
+        if self._dirty and segment == self.active_segment:
+            with self._lock:
+                self._data_file.flush()
+                self._index_file.flush()
+                self._dirty = False
+
+    def append(self, entry: Dict) -> int:
+        return self.append_many([entry])
+
+    def append_many(self, entries: List[Dict]) -> int:
+        lines = [(json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8") for entry in entries]
+
+        with self._lock:
+            first_id = len(self)
+            pending = 0
+            while pending < len(lines):
+                if self.active_count >= self.segment_entries:
+                    self._sync()
+                    self._roll()
+
+                chunk = lines[pending:pending + self.segment_entries - self.active_count]
+                offset = self._data_file.tell()
+                offsets = []
+                for line in chunk:
+                    offsets.append(OFFSET.pack(offset))
+                    offset += len(line)
+
+                self._data_file.write(b"".join(chunk))
+                self._index_file.write(b"".join(offsets))
+                self.active_count += len(chunk)
+                pending += len(chunk)
+
+            self._sync()
+            return first_id
+
+    def _roll(self) -> None:
+        self.active_segment += 1
+        self.active_count = 0
+        self._open_active()
+        self.compact_async()
+
+    def get(self, entry_id: int) -> Optional[Dict]:
+        if not 0 <= entry_id < len(self):
+            return None
+
+        segment, local = divmod(entry_id, self.segment_entries)
+        self._flush_for_read(segment)
+        try:
+            if segment in self._archived:
+                return self._read_archived(segment, local)
+            return self._read_plain(segment, local)
+        except FileNotFoundError:
+            if segment in self._archived:
+                return self._read_archived(segment, local)
+            raise
+
+    def _read_plain(self, segment: int, local: int) -> Dict:
+        with self._index_path(segment).open("rb") as f:
+            f.seek(local * OFFSET.size)
+            offset, = OFFSET.unpack(f.read(OFFSET.size))
+        with self._data_path(segment).open("rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline().decode("utf-8"))
+
+    def _read_archived(self, segment: int, local: int) -> Dict:
+        with self._archive_index_path(segment).open("rb") as f:
+            f.seek(local * ARCHIVE_RECORD.size)
+            offset, length = ARCHIVE_RECORD.unpack(f.read(ARCHIVE_RECORD.size))
+        with self._archive_path(segment).open("rb") as f:
+            f.seek(offset)
+            return json.loads(zlib.decompress(f.read(length)).decode("utf-8"))
+
+    def iter_entries(self, start: int = 0) -> Iterator[Dict]:
+        entry_id = max(0, start)
+        end = len(self)
+        while entry_id < end:
+            segment, local = divmod(entry_id, self.segment_entries)
+            if segment in self._archived:
+                entry = self._read_archived(segment, local)
+                entry_id += 1
+                yield entry
+                continue
+
+            self._flush_for_read(segment)
+            with self._data_path(segment).open("rb") as f:
+                if local:
+                    with self._index_path(segment).open("rb") as idx:
+                        idx.seek(local * OFFSET.size)
+                        f.seek(OFFSET.unpack(idx.read(OFFSET.size))[0])
+                segment_end = min(end, (segment + 1) * self.segment_entries)
+                while entry_id < segment_end:
+                    yield json.loads(f.readline().decode("utf-8"))
+                    entry_id += 1
+
+    def tail(self, count: int) -> List[Dict]:
+        return list(self.iter_entries(len(self) - count))
+
+    def import_jsonl(self, path: Path) -> int:
+        imported = 0
+        with Path(path).open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line.strip())
+                except:
+                    continue
+                self.append(entry)
+                imported += 1
+        return imported
+
+    def compact_async(self) -> None:
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return
+        self._compaction_thread = threading.Thread(target=self.compact, name="memory-compaction", daemon=True)
+        self._compaction_thread.start()
+
+    def compact(self) -> int:
+        archived = 0
+        for segment in range(self.active_segment - self.hot_segments):
+            if segment in self._archived or not self._data_path(segment).exists():
+                continue
+            try:
+                self._archive_segment(segment)
+                archived += 1
+            except Exception as e:
+                print(f"Memory compaction error: {e}")
+                break
+        return archived
+
+    def _archive_segment(self, segment: int) -> None:
+        archive_tmp = self._archive_path(segment).with_suffix(".arc.tmp")
+        index_tmp = self._archive_index_path(segment).with_suffix(".idx.tmp")
+
+        with self._data_path(segment).open("rb") as source, \
+                archive_tmp.open("wb") as archive, index_tmp.open("wb") as index:
+            for line in source:
+                blob = zlib.compress(line.rstrip(b"\n"), 6)
+                index.write(ARCHIVE_RECORD.pack(archive.tell(), len(blob)))
+                archive.write(blob)
+
+        index_tmp.replace(self._archive_index_path(segment))
+        archive_tmp.replace(self._archive_path(segment))
+        with self._lock:
+            self._archived.add(segment)
+        self._drop_plain(segment)
+
+    def close(self) -> None:
+        if self._compaction_thread is not None:
+            self._compaction_thread.join()
+        with self._lock:
+            if self._data_file is not None:
+                self._data_file.flush()
+                self._index_file.flush()
+            self._close_active()
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+class EmbeddingCache:
+    def __init__(self, path: Optional[Path], model_name: str, dim: int,
+                 max_memory_items: int = 4096, max_disk_items: int = 200_000):
+        self.model_name = model_name
+        self.dim = dim
+        self.max_memory_items = max_memory_items
+        self.max_disk_items = max_disk_items
+
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        self._db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            try:
+                self._db = sqlite3.connect(str(path), check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL, used REAL NOT NULL)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_used ON embeddings (used)")
+                self._db.commit()
+                self._disk_items = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            except Exception as e:
+                print(f"⚠️ Embedding cache disk tier disabled: {e}")
+                self._db = None
+
+    def _key(self, text: str) -> bytes:
+        return hashlib.blake2b(f"{self.model_name}\0{text}".encode("utf-8"), digest_size=16).digest()
+
+    def _remember(self, key: bytes, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def encode(self, texts: List[str], encoder: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        normalized = [normalize_text(text) for text in texts]
+        keys = [self._key(text) for text in normalized]
+        result = np.empty((len(texts), self.dim), dtype=np.float32)
+        missing: Dict[bytes, List[int]] = {}
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    result[i] = vector
+                    self.stats["memory_hits"] += 1
+                else:
+                    missing.setdefault(key, []).append(i)
+
+            if missing and self._db is not None:
+                for key, vector in self._load(list(missing)).items():
+                    for i in missing.pop(key):
+                        result[i] = vector
+                        self.stats["disk_hits"] += 1
+                    self._remember(key, vector)
+
+        if missing:
+            unique_keys = list(missing)
+            vectors = np.asarray(encoder([normalized[missing[key][0]] for key in unique_keys]), dtype=np.float32)
+            with self._lock:
+                for key, vector in zip(unique_keys, vectors):
+                    for i in missing[key]:
+                        result[i] = vector
+                        self.stats["misses"] += 1
+                    self._remember(key, vector)
+                self._store(unique_keys, vectors)
+
+        return result
+
+    def _load(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        found: Dict[bytes, np.ndarray] = {}
+        try:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[bytes(key)] = np.frombuffer(blob, dtype=np.float32).copy()
+            if found:
+                now = time.time()
+                self._db.executemany("UPDATE embeddings SET used = ? WHERE key = ?", [(now, key) for key in found])
+                self._db.commit()
+        except Exception as e:
+            print(f"Embedding cache read error: {e}")
+        return found
+
+    def _store(self, keys: List[bytes], vectors: np.ndarray) -> None:
+        if self._db is None:
+            return
+
+        try:
+            now = time.time()
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, used) VALUES (?, ?, ?)",
+                [(key, vector.tobytes(), now) for key, vector in zip(keys, vectors)]
+            )
+            self._disk_items += len(keys)
+
+            if self._disk_items > self.max_disk_items:
+                self._disk_items = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+                overflow = self._disk_items - int(self.max_disk_items * 0.9)
+                if overflow > 0:
+                    self._db.execute(
+                        "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY used LIMIT ?)",
+                        (overflow,)
+                    )
+                    self._disk_items -= overflow
+                    self.stats["evictions"] += overflow
+            self._db.commit()
+        except Exception as e:
+            print(f"Embedding cache write error: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        return {
+            **self.stats,
+            "memory_items": len(self._memory),
+            "disk_items": self._disk_items if self._db is not None else 0,
+            "hit_rate": round(hits / lookups * 100, 1) if lookups else 0.0
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+                self._db = None
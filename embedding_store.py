@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+STORAGE_TYPES = ("float32", "int8")
+
+def quantize_int8(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+class EmbeddingStore:
+    def __init__(self, path: Path, dim: int, model_name: str, storage: str = "float32"):
+        if storage not in STORAGE_TYPES:
+            raise ValueError(f"Unknown embedding storage type: {storage}")
+
+        self.path = Path(path)
+        self.meta_path = self.path.with_name(self.path.name + ".json")
+        self.dim = dim
+        self.model_name = model_name
+        self.storage = storage
+        self.rebuilt = False
+
+        if storage == "int8":
+            self._row_dtype = np.dtype([("scale", "<f4"), ("codes", "i1", (dim,))])
+        else:
+            self._row_dtype = np.dtype(("<f4", (dim,)))
+        self._rows: np.ndarray = self._empty()
+
+        self._check_meta()
+        self._remap()
+
+    def _empty(self) -> np.ndarray:
+        if self.storage == "int8":
+            return np.zeros(0, dtype=self._row_dtype)
+        return np.zeros((0, self.dim), dtype=np.float32)
+
+    def _check_meta(self) -> None:
+        meta = {"dim": self.dim, "model": self.model_name, "dtype": self.storage}
+
+        if self.meta_path.exists():
+            try:
+                with self.meta_path.open("r", encoding="utf-8") as f:
+                    if json.load(f) == meta:
+                        return
+            except:
+                pass
+            print("⚠️ Embedding store model changed, rebuilding...")
+
+        if self.path.exists():
+            self.path.unlink()
+        self.rebuilt = True
+        with self.meta_path.open("w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    def _remap(self) -> None:
+        row_bytes = self._row_dtype.itemsize
+        size = self.path.stat().st_size if self.path.exists() else 0
+
+        if size % row_bytes:
+            with self.path.open("r+b") as f:
+                f.truncate(size - size % row_bytes)
+            size -= size % row_bytes
+
+        rows = size // row_bytes
+        if rows == 0:
+            self._rows = self._empty()
+        elif self.storage == "int8":
+            self._rows = np.memmap(self.path, dtype=self._row_dtype, mode="r", shape=(rows,))
+        else:
+            self._rows = np.memmap(self.path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+
+    def __len__(self) -> int:
+        return self._rows.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return self._rows.nbytes
+
+    def _decode(self, rows: np.ndarray) -> np.ndarray:
+        if self.storage == "int8":
+            return rows["codes"].astype(np.float32) * rows["scale"][:, None]
+        return np.asarray(rows, dtype=np.float32)
+
+    def _dot(self, rows: np.ndarray, query: np.ndarray) -> np.ndarray:
+        query = np.asarray(query, dtype=np.float32)
+        if self.storage == "int8":
+            scores = np.empty(len(rows), dtype=np.float32)
+            for i in range(0, len(rows), 4096):
+                block = rows[i:i + 4096]
+                scores[i:i + len(block)] = (block["codes"].astype(np.float32) @ query) * block["scale"]
+            return scores
+        return rows @ query
+
+    def vectors(self, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+        return self._decode(self._rows[start:end])
+
+    def take(self, ids: np.ndarray) -> np.ndarray:
+        return self._decode(self._rows[np.asarray(ids, dtype=np.int64)])
+
+    def dot_ids(self, query: np.ndarray, ids: np.ndarray) -> np.ndarray:
+        return self._dot(self._rows[np.asarray(ids, dtype=np.int64)], query)
+
+    def append(self, vectors: np.ndarray) -> None:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        if len(vectors) == 0:
+            return
+
+        if self.storage == "int8":
+            rows = np.empty(len(vectors), dtype=self._row_dtype)
+            rows["codes"], rows["scale"] = quantize_int8(vectors)
+        else:
+            rows = vectors
+
+        with self.path.open("ab") as f:
+            f.write(rows.tobytes())
+        self._remap()
+
+    def truncate(self, rows: int) -> None:
+        if rows >= len(self):
+            return
+
+        self._rows = self._empty()
+        with self.path.open("r+b") as f:
+            f.truncate(rows * self._row_dtype.itemsize)
+        self._remap()
+
+    def search(self, query: np.ndarray, top_k: int, start: int = 0) -> tuple[np.ndarray, np.ndarray]:
+        candidates = self._rows[start:]
+        if len(candidates) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        scores = self._dot(candidates, query)
+        top_k = min(top_k, len(scores))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+
+        return top + start, scores[top]
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from cache_codec import CacheCodec
+
+class SQLiteCache:
+    def __init__(self, path: Path, max_entries: int = 10000, sweep_interval: float = 60.0,
+                 vacuum_pages: int = 256, codec: Optional[CacheCodec] = None):
+        self.path = Path(path)
+        self.codec = codec or CacheCodec()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.sweep_interval = sweep_interval
+        self.vacuum_pages = vacuum_pages
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, "
+            "expires REAL NOT NULL, used REAL NOT NULL)"
+        )
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(entries)")]
+        if "stale" not in columns:
+            self._db.execute("ALTER TABLE entries ADD COLUMN stale REAL NOT NULL DEFAULT 0")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries (used)")
+        self._db.commit()
+
+        self._stop = threading.Event()
+        self._janitor = threading.Thread(target=self._sweep_loop, name="file-cache-janitor", daemon=True)
+        self._janitor.start()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, created, expires, stale FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[2] <= now:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+            self._db.execute("UPDATE entries SET used = ? WHERE key = ?", (now, key))
+            self._db.commit()
+
+        return {"response": self.codec.decode(row[0]), "timestamp": row[1], "ttl": row[2] - row[1] - row[3], "stale": row[3]}
+
+    def set(self, key: str, response: Any, ttl: float, stale: float = 0) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, created, expires, used, stale) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, self.codec.encode(response), now, now + ttl + stale, now, stale)
+            )
+            self._db.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._db.commit()
+            self._db.execute("PRAGMA incremental_vacuum")
+
+    def import_json(self, path: Path) -> int:
+        with Path(path).open("r", encoding="utf-8") as f:
+            legacy = json.load(f)
+
+        now = time.time()
+        rows = [
+            (key, self.codec.encode(data["response"]), data["timestamp"],
+             data["timestamp"] + data["ttl"], now)
+            for key, data in legacy.items()
+            if data["timestamp"] + data["ttl"] > now
+        ]
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO entries (key, value, created, expires, used) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._db.commit()
+        return len(rows)
+
+    def sweep(self) -> Dict[str, int]:
+        now = time.time()
+        with self._lock:
+            expired = self._db.execute("DELETE FROM entries WHERE expires <= ?", (now,)).rowcount
+            overflow = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+            evicted = 0
+            if overflow > 0:
+                evicted = self._db.execute(
+                    "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY used LIMIT ?)", (overflow,)
+                ).rowcount
+            self._db.commit()
+            if expired or evicted:
+                self._db.execute(f"PRAGMA incremental_vacuum({self.vacuum_pages})")
+        return {"expired": expired, "evicted": evicted}
+
+    def _sweep_loop(self) -> None:
+        while not self._stop.wait(self.sweep_interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"File cache sweep error: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            total, valid = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(expires > ?), 0) FROM entries", (now,)
+            ).fetchone()
+        return {
+            "total_keys": total,
+            "valid_keys": valid,
+            "expired_keys": total - valid,
+            "max_keys": self.max_entries,
+            "file_size": self.path.stat().st_size if self.path.exists() else 0
+        }
+
+    def close(self) -> None:
+        self._stop.set()
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Set
+
+POLICIES = ("fixed", "partition")
+
+class GenerationLease:
+    def __init__(self, threads: int, active: int):
+        self.threads = threads
+        self.peak = active
+        self.metrics: Dict[str, Any] = {}
+
+class GenerationScheduler:
+    def __init__(self, total_threads: int, max_active: int = 2, policy: str = "fixed",
+                 stats_path: Optional[Path] = None, save_interval: float = 300.0):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown generation policy: {policy}")
+        self.total_threads = total_threads
+        self.max_active = max(1, max_active)
+        self.policy = policy
+        self.threads = total_threads if policy == "fixed" else max(1, total_threads // self.max_active)
+        self.stats_path = Path(stats_path) if stats_path else None
+        self.save_interval = save_interval
+        self._saved = time.monotonic()
+
+        self._leases: Set[GenerationLease] = set()
+        self._waiters: Deque[tuple[float, asyncio.Future]] = deque()
+        self.stats = {"generations": 0, "queued": 0, "total_wait": 0.0}
+        self.configs: Dict[str, Dict[str, float]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if self.stats_path is None or not self.stats_path.exists():
+            return
+        try:
+            with self.stats_path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("total_threads") == self.total_threads:
+                self.configs = data.get("configs", {})
+        except Exception as e:
+            print(f"Generation stats load error: {e}")
+
+    def save(self) -> None:
+        self._saved = time.monotonic()
+        if self.stats_path is None or not self.configs:
+            return
+        self.stats_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.stats_path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump({"total_threads": self.total_threads, "configs": self.configs}, f, indent=2)
+        tmp_path.replace(self.stats_path)
+
+    def _has_room(self) -> bool:
+        return self.policy == "fixed" or len(self._leases) < self.max_active
+
+    def _admit(self) -> GenerationLease:
+        lease = GenerationLease(self.threads, len(self._leases) + 1)
+        self._leases.add(lease)
+        for other in self._leases:
+            other.peak = max(other.peak, len(self._leases))
+        return lease
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        while self._waiters and self._has_room():
+            enqueued, future = self._waiters.popleft()
+            if future.done():
+                continue
+            self.stats["total_wait"] += now - enqueued
+            future.set_result(self._admit())
+
+    async def acquire(self) -> GenerationLease:
+        self.stats["generations"] += 1
+        if self._has_room() and not self._waiters:
+            return self._admit()
+
+        self.stats["queued"] += 1
+        entry = (time.monotonic(), asyncio.get_running_loop().create_future())
+        self._waiters.append(entry)
+        try:
+            return await entry[1]
+        except asyncio.CancelledError:
+            if entry in self._waiters:
+                self._waiters.remove(entry)
+            elif entry[1].done() and not entry[1].cancelled():
+                self.release(entry[1].result())
+            raise
+
+    def release(self, lease: GenerationLease) -> None:
+        self._leases.discard(lease)
+        self.record(lease)
+        self._dispatch()
+
+    def record(self, lease: GenerationLease) -> None:
+        tokens = lease.metrics.get("eval_count", 0)
+        seconds = lease.metrics.get("eval_duration", 0) / 1e9
+        if not tokens or seconds <= 0:
+            return
+        key = f"{lease.threads}t x{lease.peak}"
+        config = self.configs.setdefault(key, {"threads": lease.threads, "concurrent": lease.peak,
+                                               "generations": 0, "tokens": 0, "seconds": 0.0})
+        config["generations"] += 1
+        config["tokens"] += tokens
+        config["seconds"] += seconds
+
+        if time.monotonic() - self._saved >= self.save_interval:
+            try:
+                self.save()
+            except Exception as e:
+                print(f"Generation stats save error: {e}")
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[GenerationLease]:
+        lease = await self.acquire()
+        try:
+            yield lease
+        finally:
+            self.release(lease)
+
+    def get_stats(self) -> Dict[str, Any]:
+        configs = {}
+        for key, config in self.configs.items():
+            tokens_per_s = config["tokens"] / config["seconds"] if config["seconds"] else 0.0
+            configs[key] = {
+                **config,
+                "tokens_per_s": round(tokens_per_s, 2),
+                "aggregate_tokens_per_s": round(tokens_per_s * config["concurrent"], 2)
+            }
+        best = max(configs, key=lambda key: configs[key]["aggregate_tokens_per_s"]) if configs else None
+        return {
+            **self.stats,
+            "policy": self.policy,
+            "threads": self.threads,
+            "active": len(self._leases),
+            "waiting": len(self._waiters),
+            "configs": configs,
+            "best": best
+        }
@@ -1,6 +1,6 @@
 import gradio as gr
-from multi_agent_streaming import LocalAgent, MEMORY, search_web, parse_contribution_scores
-from config import MODEL_LLAMA, MODEL_GEMMA
+from multi_agent_streaming import LocalAgent, MEMORY, search_context, parse_contribution_scores, warmup_services, services_ready, wait_for_services
+from config import MODEL_LLAMA, MODEL_GEMMA, THINK_SESSION_MODE, THINK_SEARCH_TOKENS
 import json
 from datetime import datetime
 import os
@@ -40,6 +40,7 @@ UI_TEXTS = {
         "status_done_round": "✓ Tur {} bitti",
         "status_complete": "✨ Analiz tamamlandı.",
         "status_ready": "✓ Hazır",
+        "status_warming": "⏳ Hafıza ve önbellek hazırlanıyor...",
         "status_paused": "⏸️ Duraklatıldı. Devam etmek için butona basın.",
         "status_stopped": "⛔ İşlem iptal edildi.",
         "err": "❌ Hata",
@@ -79,6 +80,7 @@ UI_TEXTS = {
         "status_done_round": "✓ Round {} finished",
         "status_complete": "✨ Analysis complete.",
         "status_ready": "✓ Ready",
+        "status_warming": "⏳ Warming up memory and cache...",
         "status_paused": "⏸️ Paused. Press continue to resume.",
         "status_stopped": "⛔ Process cancelled.",
         "err": "❌ Error",
@@ -147,6 +149,8 @@ async def start_thinking_stream(question, rounds, language):
             "Gemma", MODEL_GEMMA,
             f"Sen eleştirel düşünce asistanısın.\nAlternatif görüşler sun.\nQwen'in görüşüne ne kadar katıldığını (Haklılık Payı: %X) belirt.\nKısa ve net ol.\n{lang_instruction}"
         )
+        qwen_agent = qwen.session() if THINK_SESSION_MODE else qwen
+        gemma_agent = gemma.session() if THINK_SESSION_MODE else gemma
         
         output = f"{t['topic_header']} {question}\n"
         output += f"{t['lang_header']} {language.upper()} | {t['rounds_header']} {rounds}\n"
@@ -174,14 +178,11 @@ async def start_thinking_stream(question, rounds, language):
             bar_html = get_confidence_html(current_scores["Qwen"], current_scores["Gemma"], language)
             yield output, gr.update(), t["status_processing"].format(round_count), bar_html
             
-            search_context = ""
+            web_context = ""
             if round_count % 3 == 0:
                 output += f"{t['internet_check']}\n\n"
                 yield output, gr.update(), t["status_searching"], bar_html
-                try:
-                    search_context, _ = search_web(current_context, max_results=3)
-                except:
-                    pass
+                web_context, _ = await search_context(current_context, max_results=3, max_tokens=THINK_SEARCH_TOKENS)
             
             if STOP_EVENT.is_set(): break
             await check_pause()
@@ -190,11 +191,11 @@ async def start_thinking_stream(question, rounds, language):
                 qwen_prompt = f"Soru: {question}\n\nBu konuyu analiz et."
             else:
                 qwen_prompt = f"Önceki: {gemma_last}\n\nEleştir ve sentezle."
-            if search_context: qwen_prompt += f"\n\nBilgi:\n{search_context[:500]}"
+            if web_context: qwen_prompt += f"\n\nBilgi:\n{web_context}"
             
             output += "🤖 Qwen:\n"
             qwen_response = ""
-            async for chunk in qwen.think_stream(qwen_prompt, temp_override=0.8):
+            async for chunk in qwen_agent.think_stream(qwen_prompt, temp_override=0.8):
                 if STOP_EVENT.is_set(): break
                 await check_pause()
                 if chunk:
@@ -211,7 +212,7 @@ async def start_thinking_stream(question, rounds, language):
 
             output += "🤖 Gemma:\n"
             gemma_response = ""
-            async for chunk in gemma.think_stream(gemma_prompt, temp_override=0.8):
+            async for chunk in gemma_agent.think_stream(gemma_prompt, temp_override=0.8):
                 if STOP_EVENT.is_set(): break
                 await check_pause()
                 if chunk:
@@ -243,7 +244,7 @@ async def start_thinking_stream(question, rounds, language):
              output += f"\n{t['status_stopped']}\n"
         else:
              output += f"\n{t['status_complete']}\n"
-             MEMORY.add_conversation(
+             await (await MEMORY.get_async()).add_conversation_async(
                  user_msg=question,
                  qwen_resp=last_qwen_resp,
                  gemma_resp=last_gemma_resp,
@@ -331,6 +332,13 @@ def export_current_conversation(format_type):
     with open(filepath, "w", encoding="utf-8") as f: f.write(content)
     return filepath
 
+async def readiness_status():
+    t = UI_TEXTS["tr"]
+    if not services_ready():
+        yield t["status_warming"]
+    ready = await asyncio.to_thread(wait_for_services, 300)
+    yield t["status_ready"] if ready else t["err"]
+
 def update_interface_language(lang):
     t = UI_TEXTS[lang]
     bar = get_confidence_html(50, 50, lang)
@@ -414,6 +422,8 @@ with gr.Blocks(css=custom_css, title="Think AI") as demo:
     think_language.change(fn=update_interface_language, inputs=[think_language], outputs=[history_header, history_dropdown, load_btn, settings_header, think_rounds, export_btn, status_text, confidence_display, think_question, think_btn, stop_btn, continue_btn, reset_btn, think_output])
     load_btn.click(load_history, inputs=[history_dropdown], outputs=[think_output, status_text, confidence_display])
     export_btn.click(export_current_conversation, inputs=[gr.State("MD")], outputs=[export_file])
+    demo.load(readiness_status, outputs=[status_text])
 
 if __name__ == "__main__":
+    warmup_services()
     demo.launch(server_name="0.0.0.0", server_port=7860, share=True)
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import atexit
+import queue
+import threading
+import time
+from typing import Any, Callable, List, Optional
+
+_STOP = object()
+
+class GroupCommitWriter:
+    def __init__(self, commit: Callable[[List[Any]], None], name: str = "group-writer",
+                 flush_interval: float = 0.05, max_batch: int = 64, max_pending: int = 1024):
+        self._commit = commit
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._closed = False
+        self.stats = {"batches": 0, "items": 0, "errors": 0, "max_batch_seen": 0}
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, item: Any, timeout: Optional[float] = None) -> None:
+        if self._closed:
+            self._commit_batch([item])
+            return
+        self._queue.put(item, timeout=timeout)
+
+    def try_submit(self, item: Any) -> bool:
+        if self._closed:
+            self._commit_batch([item])
+            return True
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            return False
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._commit_batch(batch)
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _commit_batch(self, batch: List[Any]) -> None:
+        try:
+            self._commit(batch)
+            self.stats["batches"] += 1
+            self.stats["items"] += len(batch)
+            self.stats["max_batch_seen"] = max(self.stats["max_batch_seen"], len(batch))
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"Write error: {e}")
+
+    def flush(self) -> None:
+        if not self._closed:
+            self._queue.join()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
@@ -11,7 +11,7 @@ from rich.text import Text
 from rich.live import Live
 
 from config import DEBUG
-from multi_agent_streaming import MultiModelOrchestrator, MEMORY
+from multi_agent_streaming import MultiModelOrchestrator, MEMORY, warmup_services, shutdown_services, gather_context, service_stats
 from ultimate_think import UltimateThink
 
 console = Console()
@@ -20,6 +20,7 @@ def setup_logging() -> None:
     logging.basicConfig(level=logging.ERROR)
 
 async def chat_loop() -> None:
+    warmup_services()
     orchestrator = MultiModelOrchestrator()
 
     help_text = """🧠 ULTIMATE AI THINK - Qwen 7B + Gemma 9B
@@ -36,6 +37,7 @@ KOMUTLAR:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 /think     → Derin düşünce başlat 🧠
 /memory    → Hafıza özeti
+/stats     → Üretim istatistikleri
 /clear     → Hafıza temizle
 q          → Çıkış
 
@@ -56,15 +58,19 @@ Normal yaz → Tek seferlik soru-cevap"""
             break
         
         if user_input.strip() == "/memory":
-            summary = MEMORY.get_recent_summary(last_n=5)
+            summary = (await MEMORY.get_async()).get_recent_summary(last_n=5)
             if summary:
                 console.print(Panel(summary, title="🧠 HAFIZA ÖZETİ", border_style="yellow"))
             else:
                 console.print("[dim]Henüz hafızada bir şey yok.[/dim]")
             continue
         
+        if user_input.strip() == "/stats":
+            console.print_json(data=service_stats())
+            continue
+        
         if user_input.strip() == "/clear":
-            MEMORY.clear_memory()
+            (await MEMORY.get_async()).clear_memory()
             console.print("[green]✅ Hafıza temizlendi[/green]")
             continue
         
@@ -93,10 +99,9 @@ Normal yaz → Tek seferlik soru-cevap"""
             continue
 
         else:
-            memory_context = MEMORY.search_relevant_context(user_input)
-            
-            from multi_agent_streaming import search_web
-            search_context, result_list = search_web(user_input, max_results=5)
+            context = await gather_context(user_input, max_results=5)
+            memory_context = context["memory"]
+            search_context, result_list = context["search"], context["results"]
             
             if result_list:
                 for i, result in enumerate(result_list, 1):
@@ -191,7 +196,7 @@ Normal yaz → Tek seferlik soru-cevap"""
                     progress.add_task("  QWEN ", total=100, completed=q_score)
                     progress.add_task("  GEMMA", total=100, completed=g_score)
             
-            MEMORY.add_conversation(
+            await (await MEMORY.get_async()).add_conversation_async(
                 user_msg=user_input,
                 qwen_resp=qwen_response,
                 gemma_resp=gemma_response,
@@ -200,9 +205,15 @@ Normal yaz → Tek seferlik soru-cevap"""
             
             console.print("-" * 60)
 
+async def run_chat() -> None:
+    try:
+        await chat_loop()
+    finally:
+        await shutdown_services()
+
 def main() -> None:
     setup_logging()
-    asyncio.run(chat_loop())
+    asyncio.run(run_chat())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
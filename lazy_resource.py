@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Callable, Optional
+
+class LazyResource:
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self.name = name
+        self._factory = factory
+        self._instance: Optional[Any] = None
+        self._lock = threading.Lock()
+        self._warmup_thread: Optional[threading.Thread] = None
+        self.ready = threading.Event()
+
+    def get(self) -> Any:
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+                    self.ready.set()
+        return self._instance
+
+    async def get_async(self) -> Any:
+        if self._instance is not None:
+            return self._instance
+        return await asyncio.to_thread(self.get)
+
+    def warmup(self) -> threading.Thread:
+        with self._lock:
+            if self._warmup_thread is None or not self._warmup_thread.is_alive():
+                self._warmup_thread = threading.Thread(target=self._warm, name=f"{self.name}-warmup", daemon=True)
+                self._warmup_thread.start()
+            return self._warmup_thread
+
+    def _warm(self) -> None:
+        try:
+            self.get()
+        except Exception as e:
+            print(f"⚠️ {self.name} warmup failed: {e}")
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self.get(), item)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import json
+import math
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+TURKISH_LOWER = str.maketrans({"İ": "i", "I": "ı"})
+
+def tokenize(text: str, prefix_length: int = 5) -> List[str]:
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.translate(TURKISH_LOWER).lower()):
+        if token.isalpha() and len(token) > prefix_length:
+            token = token[:prefix_length]
+        tokens.append(token)
+    return tokens
+
+class BM25Index:
+    def __init__(self, path: Path, k1: float = 1.5, b: float = 0.75):
+        self.path = Path(path)
+        self.k1 = k1
+        self.b = b
+
+        self._lock = threading.Lock()
+        self._postings: Dict[str, tuple[List[int], List[int]]] = {}
+        self._doc_lengths: List[int] = []
+        self._total_length = 0
+
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+
+        valid_bytes = 0
+        try:
+            with self.path.open("rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    self._index(json.loads(line.decode("utf-8")))
+                    valid_bytes += len(line)
+        except Exception as e:
+            print(f"Lexical index load error: {e}")
+
+        if valid_bytes != self.path.stat().st_size:
+            with self.path.open("r+b") as f:
+                f.truncate(valid_bytes)
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def _index(self, term_counts: Dict[str, int]) -> None:
+        doc_id = len(self._doc_lengths)
+        for term, count in term_counts.items():
+            ids, counts = self._postings.setdefault(term, ([], []))
+            ids.append(doc_id)
+            counts.append(count)
+
+        length = sum(term_counts.values())
+        self._doc_lengths.append(length)
+        self._total_length += length
+
+    def add(self, texts: Iterable[str]) -> None:
+        rows = [dict(Counter(tokenize(text))) for text in texts]
+        if not rows:
+            return
+
+        with self._lock:
+            with self.path.open("ab") as f:
+                f.write(b"".join((json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8") for row in rows))
+            for row in rows:
+                self._index(row)
+
+    def truncate(self, rows: int) -> None:
+        if rows >= len(self):
+            return
+
+        with self.path.open("rb") as f:
+            kept = b"".join(line for _, line in zip(range(rows), f))
+        with self.path.open("wb") as f:
+            f.write(kept)
+
+        with self._lock:
+            self._postings.clear()
+            self._doc_lengths = []
+            self._total_length = 0
+            for line in kept.splitlines():
+                self._index(json.loads(line.decode("utf-8")))
+
+    def reference_score(self, query: str) -> float:
+        return sum(self._idf(term) for term in set(tokenize(query)))
+
+    def _idf(self, term: str) -> float:
+        df = len(self._postings[term][0]) if term in self._postings else 0
+        return math.log(1 + (len(self) - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, top_k: int, min_id: int = 0) -> tuple[np.ndarray, np.ndarray]:
+        terms = set(tokenize(query))
+        doc_count = len(self)
+        if doc_count == 0 or not terms:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        lengths = np.asarray(self._doc_lengths[:doc_count], dtype=np.float32)
+        average_length = self._total_length / doc_count
+        all_ids = []
+        all_scores = []
+
+        for term in terms:
+            if term not in self._postings:
+                continue
+            ids, counts = self._postings[term]
+            ids = np.asarray(ids, dtype=np.int64)
+            counts = np.asarray(counts[:len(ids)], dtype=np.float32)
+            ids = ids[:len(counts)]
+
+            mask = (ids >= min_id) & (ids < doc_count)
+            ids, counts = ids[mask], counts[mask]
+            norm = self.k1 * (1 - self.b + self.b * lengths[ids] / average_length)
+            all_ids.append(ids)
+            all_scores.append(self._idf(term) * counts * (self.k1 + 1) / (counts + norm))
+
+        if not all_ids:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        unique_ids, inverse = np.unique(np.concatenate(all_ids), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(all_scores)).astype(np.float32)
+        if len(scores) == 0:
+            return unique_ids, scores
+
+        top_k = min(top_k, len(scores))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        return unique_ids[top], scores[top]
@@ -1,44 +1,183 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import atexit
 import hashlib
+import shutil
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from datetime import datetime
 from collections import deque
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
+from config import (
+    EMBEDDING_MODEL, MEMORY_INDEX, MEMORY_IVF_PROBES, MEMORY_SEGMENT_ENTRIES, MEMORY_HOT_SEGMENTS,
+    MEMORY_DURABILITY, MEMORY_FLUSH_INTERVAL, MEMORY_WRITE_QUEUE,
+    MEMORY_RETRIEVAL, MEMORY_HYBRID_ALPHA, MEMORY_LEXICAL_MIN, MEMORY_LEXICAL_SHORTCUT,
+    MEMORY_PASSAGE_WORDS, MEMORY_CONTEXT_TOKENS, EMBEDDING_CACHE_MEMORY_ITEMS, EMBEDDING_CACHE_DISK_ITEMS,
+    EMBEDDING_PRECISION, EMBEDDING_STORAGE
+)
+from conversation_log import ConversationLog
+from embedding_cache import EmbeddingCache
+from embedding_store import EmbeddingStore
+from group_writer import GroupCommitWriter
+from lexical_index import BM25Index, tokenize
+from passage_index import PassageIndex, estimate_tokens
 from security_utils import SecurityFilter
+from vector_index import create_index
+
+EMBEDDING_PRECISIONS = ("float32", "float16", "int8")
+DERIVED_SUFFIXES = (".embcache", ".emb", ".pemb", ".passages", ".pidx", ".bm25", ".idx")
+
+def migrate_derived_files(legacy_base: Path, base: Path) -> None:
+    base.parent.mkdir(parents=True, exist_ok=True)
+    if legacy_base.parent.resolve() == base.parent.resolve():
+        return
+    for suffix in DERIVED_SUFFIXES:
+        for path in legacy_base.parent.glob(legacy_base.stem + suffix + "*"):
+            target = base.parent / (base.stem + path.name[len(legacy_base.stem):])
+            if not target.exists():
+                shutil.move(str(path), str(target))
+
+class EmbeddingBackend:
+    def __init__(self, model_name: str, precision: str = "float32"):
+        if precision not in EMBEDDING_PRECISIONS:
+            raise ValueError(f"Unknown embedding precision: {precision}")
+        
+        from sentence_transformers import SentenceTransformer
+        
+        self.precision = precision
+        self.name = model_name if precision == "float32" else f"{model_name}@{precision}"
+        
+        if precision == "float32":
+            self.model = SentenceTransformer(model_name)
+        elif precision == "float16":
+            import torch
+            if not torch.cuda.is_available():
+                raise ValueError("float16 embeddings need a CUDA device")
+            self.model = SentenceTransformer(model_name, device="cuda").half()
+        else:
+            import torch
+            self.model = SentenceTransformer(model_name, device="cpu")
+            self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        
+        self.dim = self.model.get_sentence_embedding_dimension()
+    
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+        return np.asarray(vectors, dtype=np.float32).reshape(len(texts), -1)
 
 class ConversationMemory:
     def __init__(self, memory_file: str = "conversation_memory.jsonl", max_history: int = 50):
         self.memory_file = Path(memory_file)
+        self.log_dir = self.memory_file.with_name(self.memory_file.stem + "_log")
+        self.index_base = self.log_dir / "index" / self.memory_file.name
         self.max_history = max_history
         self.session_memory: deque = deque(maxlen=max_history)
         self.security = SecurityFilter()
         
         print("Memory system initializing...")
-        self.embedder = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
+        self.embedder = EmbeddingBackend(EMBEDDING_MODEL, EMBEDDING_PRECISION)
+        dim = self.embedder.dim
+        index_options = {"n_probe": MEMORY_IVF_PROBES} if MEMORY_INDEX == "ivf" else {}
+        migrate_derived_files(self.memory_file, self.index_base)
+        self.embedding_cache = EmbeddingCache(
+            self.index_base.with_suffix(".embcache"), model_name=self.embedder.name, dim=dim,
+            max_memory_items=EMBEDDING_CACHE_MEMORY_ITEMS, max_disk_items=EMBEDDING_CACHE_DISK_ITEMS
+        )
+        
+        self.embeddings = EmbeddingStore(
+            self.index_base.with_suffix(".emb"), dim=dim, model_name=self.embedder.name, storage=EMBEDDING_STORAGE
+        )
+        self.passages = PassageIndex(
+            self.index_base, dim=dim, model_name=self.embedder.name, index_kind=MEMORY_INDEX,
+            max_words=MEMORY_PASSAGE_WORDS, storage=EMBEDDING_STORAGE, **index_options
+        )
+        self.lexical = BM25Index(self.index_base.with_suffix(".bm25"))
+        self.log = ConversationLog(
+            self.log_dir,
+            segment_entries=MEMORY_SEGMENT_ENTRIES,
+            hot_segments=MEMORY_HOT_SEGMENTS,
+            durability=MEMORY_DURABILITY
+        )
+        self.search_floor = 0
         
         self._load_from_disk()
         
+        self.index = create_index(MEMORY_INDEX, self.embeddings, self.index_base.with_suffix(".idx"), **index_options)
+        
+        self.writer = GroupCommitWriter(
+            self._commit_entries,
+            name="memory-writer",
+            flush_interval=MEMORY_FLUSH_INTERVAL,
+            max_pending=MEMORY_WRITE_QUEUE
+        )
+        atexit.register(self.close)
+    
+    @property
+    def total_entries(self) -> int:
+        return len(self.log)
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return self.embedding_cache.encode(texts, self._encode_uncached)
+    
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return self._encode(texts)
+    
+    def _encode_uncached(self, texts: List[str]) -> np.ndarray:
+        return self.embedder.encode(texts)
+    
+    @staticmethod
+    def _lexical_text(entry: Dict) -> str:
+        return f"{entry['user']}\n{entry['final']}"
+    
+    def _backfill(self, label: str, stored_rows: int, truncate: Callable[[int], None],
+                  add: Callable[[int, List[Dict]], None]) -> None:
+        if stored_rows > self.total_entries:
+            truncate(self.total_entries)
+        elif stored_rows < self.total_entries:
+            print(f"Indexing {self.total_entries - stored_rows} past conversations ({label})...")
+            first_id = stored_rows
+            batch: List[Dict] = []
+            for entry in self.log.iter_entries(stored_rows):
+                batch.append(entry)
+                if len(batch) == 256:
+                    add(first_id, batch)
+                    first_id += len(batch)
+                    batch = []
+            if batch:
+                add(first_id, batch)
+        
     def _load_from_disk(self) -> None:
-        if not self.memory_file.exists():
-            return
-            
+        if len(self.log) == 0 and self.memory_file.exists():
+            try:
+                imported = self.log.import_jsonl(self.memory_file)
+                print(f"Migrated {imported} conversations to segmented log")
+            except Exception as e:
+                print(f"Memory migration error: {e}")
+        
         try:
-            with self.memory_file.open("r", encoding="utf-8") as f:
-                for line in f:
-                    try:
-                        entry = json.loads(line.strip())
-                        self.session_memory.append(entry)
-                    except:
-                        continue
+            self.session_memory.extend(self.log.tail(self.max_history))
         except Exception as e:
             print(f"Memory load error: {e}")
+        
+        self._backfill(
+            "embeddings", len(self.embeddings), self.embeddings.truncate,
+            lambda _, batch: self.embeddings.append(self._encode([entry["user"] for entry in batch]))
+        )
+        self._backfill(
+            "lexical", len(self.lexical), self.lexical.truncate,
+            lambda _, batch: self.lexical.add(self._lexical_text(entry) for entry in batch)
+        )
+        
+        self._backfill(
+            "passages", self.passages.covered_entries, self.passages.truncate_entries,
+            lambda first_id, batch: self.passages.add_entries(first_id, batch, self._encode)
+        )
+        
+        self.log.compact_async()
     
-    def add_conversation(self, user_msg: str, qwen_resp: str, gemma_resp: str, final_answer: str) -> None:
+    def _build_entry(self, user_msg: str, qwen_resp: str, gemma_resp: str, final_answer: str) -> Dict:
         clean_user = self.security.sanitize_text(user_msg)
         clean_qwen = self.security.sanitize_text(qwen_resp)
         clean_gemma = self.security.sanitize_text(gemma_resp)
@@ -54,40 +193,171 @@ class ConversationMemory:
         }
         
         self.session_memory.append(entry)
+        return entry
+    
+    def add_conversation(self, user_msg: str, qwen_resp: str, gemma_resp: str, final_answer: str) -> None:
+        entry = self._build_entry(user_msg, qwen_resp, gemma_resp, final_answer)
+        self.writer.submit(entry)
+    
+    async def add_conversation_async(self, user_msg: str, qwen_resp: str, gemma_resp: str, final_answer: str) -> None:
+        entry = self._build_entry(user_msg, qwen_resp, gemma_resp, final_answer)
+        if not self.writer.try_submit(entry):
+            await asyncio.to_thread(self.writer.submit, entry)
+    
+    def _commit_entries(self, entries: List[Dict]) -> None:
+        first_id = self.log.append_many(entries)
+        
+        try:
+            start = len(self.embeddings)
+            if start == first_id:
+                texts = [entry["user"] for entry in entries]
+            else:
+                texts = [entry["user"] for entry in self.log.iter_entries(start)]
+            
+            vectors = self._encode(texts)
+            self.embeddings.append(vectors)
+            self.index.add(start, vectors)
+        except Exception as e:
+            print(f"Memory indexing error: {e}")
+        
+        try:
+            start = len(self.lexical)
+            pending = entries if start == first_id else self.log.iter_entries(start)
+            self.lexical.add(self._lexical_text(entry) for entry in pending)
+        except Exception as e:
+            print(f"Lexical indexing error: {e}")
         
         try:
-            with self.memory_file.open("a", encoding="utf-8") as f:
-                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            start = self.passages.covered_entries
+            if start >= first_id:
+                self.passages.add_entries(first_id, entries, self._encode)
+            else:
+                self.passages.add_entries(start, list(self.log.iter_entries(start)), self._encode)
+        except Exception as e:
+            print(f"Passage indexing error: {e}")
+    
+    def flush(self) -> None:
+        self.writer.flush()
+    
+    def close(self) -> None:
+        self.writer.close()
+        self.log.close()
+        self.embedding_cache.close()
+    
+    def get_entry(self, entry_id: int) -> Optional[Dict]:
+        try:
+            return self.log.get(entry_id)
         except Exception as e:
-            print(f"Memory save error: {e}")
+            print(f"Memory read error: {e}")
+            return None
+    
+    def _rank(self, clean_query: str, top_k: int) -> tuple[List[tuple[int, float]], Optional[np.ndarray]]:
+        lexical: Dict[int, float] = {}
+        if MEMORY_RETRIEVAL != "vector":
+            reference = self.lexical.reference_score(clean_query)
+            if reference > 0:
+                ids, scores = self.lexical.search(clean_query, top_k * 4, min_id=self.search_floor)
+                lexical = {int(i): min(1.0, float(score) / reference) for i, score in zip(ids, scores)}
+            
+            best = max(lexical.values(), default=0.0)
+            if MEMORY_RETRIEVAL == "lexical" or best >= MEMORY_LEXICAL_SHORTCUT:
+                ranked = [(i, score) for i, score in lexical.items() if score >= MEMORY_LEXICAL_MIN]
+                return sorted(ranked, key=lambda item: -item[1])[:top_k], None
+        
+        query_embedding = self._encode([clean_query])[0]
+        ids, similarities = self.index.search(query_embedding, top_k * 4, min_id=self.search_floor)
+        vector = {int(i): float(similarity) for i, similarity in zip(ids, similarities)}
+        
+        missing = [i for i in lexical if i not in vector and i < len(self.embeddings)]
+        if missing:
+            for i, similarity in zip(missing, self.embeddings.dot_ids(query_embedding, missing)):
+                vector[i] = float(similarity)
+        
+        alpha = MEMORY_HYBRID_ALPHA if lexical else 1.0
+        ranked = []
+        for i in set(vector) | set(lexical):
+            similarity = vector.get(i, 0.0)
+            lexical_score = lexical.get(i, 0.0)
+            if similarity > 0.3 or lexical_score >= MEMORY_LEXICAL_MIN:
+                ranked.append((i, alpha * similarity + (1 - alpha) * lexical_score))
+        
+        return sorted(ranked, key=lambda item: -item[1])[:top_k], query_embedding
+    
+    def _rank_passages(self, clean_query: str, ranked: List[tuple[int, float]],
+                       query_embedding: Optional[np.ndarray], top_k: int) -> List[tuple[int, float]]:
+        entry_scores = dict(ranked)
+        scores: Dict[int, float] = {}
+        
+        if query_embedding is None:
+            query_terms = set(tokenize(clean_query))
+            for entry_id, entry_score in ranked:
+                entry = self.get_entry(entry_id)
+                if entry is None or not query_terms:
+                    continue
+                for passage_id in self.passages.passages_for_entry(entry_id):
+                    terms = set(tokenize(self.passages.passage_text(passage_id, entry)))
+                    overlap = len(query_terms & terms) / len(query_terms)
+                    if overlap > 0:
+                        scores[int(passage_id)] = entry_score * overlap
+            return sorted(scores.items(), key=lambda item: -item[1])
+        
+        ids, similarities = self.passages.search(query_embedding, top_k * 8, min_entry=self.search_floor)
+        for passage_id, similarity in zip(ids, similarities):
+            if similarity > 0.3:
+                scores[int(passage_id)] = float(similarity)
+        
+        for entry_id in entry_scores:
+            ids, similarities = self.passages.similarities(query_embedding, self.passages.passages_for_entry(entry_id))
+            for passage_id, similarity in zip(ids, similarities):
+                scores[int(passage_id)] = float(similarity)
+        
+        for passage_id in scores:
+            entry_score = entry_scores.get(self.passages.entry_of(passage_id), 0.0)
+            scores[passage_id] = 0.7 * scores[passage_id] + 0.3 * entry_score
+        
+        return sorted(scores.items(), key=lambda item: -item[1])
     
     def search_relevant_context(self, query: str, top_k: int = 3) -> str:
-        if len(self.session_memory) == 0:
+        if self.total_entries <= self.search_floor:
             return ""
         
         clean_query = self.security.sanitize_text(query)
         if self.security.check_prompt_injection(clean_query):
             return "WARNING: Potential prompt injection detected. Context retrieval blocked."
 
-        query_embedding = self.embedder.encode([clean_query])[0]
-        
-        past_texts = [entry["user"] for entry in self.session_memory]
-        past_embeddings = self.embedder.encode(past_texts)
+        ranked, query_embedding = self._rank(clean_query, top_k)
+        passages = self._rank_passages(clean_query, ranked, query_embedding, top_k)
         
-        similarities = np.dot(past_embeddings, query_embedding) / (
-            np.linalg.norm(past_embeddings, axis=1) * np.linalg.norm(query_embedding)
-        )
-        
-        top_indices = np.argsort(similarities)[-top_k:][::-1]
+        budget = MEMORY_CONTEXT_TOKENS
+        entries: Dict[int, Dict] = {}
+        selected: Dict[int, List[str]] = {}
+        for passage_id, _ in passages:
+            entry_id = self.passages.entry_of(passage_id)
+            if entry_id not in entries:
+                entry = self.get_entry(entry_id)
+                if entry is None:
+                    continue
+                entries[entry_id] = entry
+            
+            text = self.passages.passage_text(passage_id, entries[entry_id])
+            cost = estimate_tokens(text)
+            if entry_id not in selected:
+                if len(selected) >= top_k:
+                    continue
+                cost += estimate_tokens(entries[entry_id]["user"][:100]) + 8
+            if cost > budget:
+                continue
+            
+            selected.setdefault(entry_id, []).append(text)
+            budget -= cost
         
         context = "RELEVANT CONTEXT FROM HISTORY:\n\n"
-        for idx in top_indices:
-            if similarities[idx] > 0.3:
-                entry = list(self.session_memory)[idx]
-                context += f"[{entry['timestamp'][:10]}] User: {entry['user'][:100]}...\n"
-                context += f"Response: {entry['final'][:200]}...\n\n"
+        for entry_id, texts in selected.items():
+            entry = entries[entry_id]
+            context += f"[{entry['timestamp'][:10]}] User: {entry['user'][:100]}\n"
+            context += f"Response: {' … '.join(texts)}\n\n"
         
-        return context if len(context) > 100 else ""
+        return context if selected else ""
     
     def get_recent_summary(self, last_n: int = 5) -> str:
         if len(self.session_memory) == 0:
@@ -103,4 +373,5 @@ class ConversationMemory:
     
     def clear_memory(self) -> None:
         self.session_memory.clear()
+        self.search_floor = self.total_entries
         print("Session memory cleared")
\ No newline at end of file
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterable, Optional, Tuple
+
+class ModelAffinityScheduler:
+    def __init__(self, max_concurrent: int = 2, max_wait: float = 5.0, enabled: bool = True):
+        self.enabled = enabled
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait
+        self.active: Optional[str] = None
+        self.running = 0
+        self._queues: Dict[str, Deque[tuple[float, asyncio.Future]]] = {}
+        self.stats = {"jobs": 0, "queued": 0, "switches": 0, "forced_switches": 0, "total_wait": 0.0}
+
+    def _waiting(self, model: str) -> bool:
+        return bool(self._queues.get(model))
+
+    def _starving(self, now: float) -> Optional[str]:
+        oldest: Optional[tuple[float, str]] = None
+        for model, queue in self._queues.items():
+            if model != self.active and queue and (oldest is None or queue[0][0] < oldest[0]):
+                oldest = (queue[0][0], model)
+        if oldest is not None and now - oldest[0] >= self.max_wait:
+            return oldest[1]
+        return None
+
+    def _can_admit(self, model: str, now: float) -> bool:
+        return (self.active in (None, model) and self.running < self.max_concurrent
+                and not self._waiting(model) and self._starving(now) is None)
+
+    def _admit_from(self, model: str) -> None:
+        queue = self._queues.get(model)
+        now = time.monotonic()
+        while queue and self.running < self.max_concurrent:
+            enqueued, future = queue.popleft()
+            if future.done():
+                continue
+            self.running += 1
+            self.stats["total_wait"] += now - enqueued
+            future.set_result(None)
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        if self.running > 0:
+            if self.active is not None and self._starving(now) is None:
+                self._admit_from(self.active)
+            return
+
+        starving = self._starving(now)
+        if starving is not None:
+            next_model = starving
+            self.stats["forced_switches"] += 1
+        elif self._waiting(self.active):
+            next_model = self.active
+        else:
+            waiting = [(queue[0][0], model) for model, queue in self._queues.items() if queue]
+            next_model = min(waiting)[1] if waiting else None
+
+        if next_model is None:
+            return
+        if next_model != self.active and self.active is not None:
+            self.stats["switches"] += 1
+        self.active = next_model
+        self._admit_from(next_model)
+
+    async def acquire(self, model: str) -> None:
+        self.stats["jobs"] += 1
+        now = time.monotonic()
+        if self._can_admit(model, now):
+            if self.active != model and self.active is not None:
+                self.stats["switches"] += 1
+            self.active = model
+            self.running += 1
+            return
+
+        self.stats["queued"] += 1
+        entry = (now, asyncio.get_running_loop().create_future())
+        queue = self._queues.setdefault(model, deque())
+        queue.append(entry)
+        if self.running == 0:
+            self._dispatch()
+        try:
+            await entry[1]
+        except asyncio.CancelledError:
+            if entry in queue:
+                queue.remove(entry)
+            elif not entry[1].cancelled():
+                self.release(model)
+            raise
+
+    def release(self, model: str) -> None:
+        self.running -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, model: str) -> AsyncIterator[None]:
+        if not self.enabled:
+            yield
+            return
+        await self.acquire(model)
+        try:
+            yield
+        finally:
+            self.release(model)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "active": self.active,
+            "running": self.running,
+            "waiting": {model: len(queue) for model, queue in self._queues.items() if queue}
+        }
+
+class BackendSchedulers:
+    def __init__(self, endpoints: Callable[[str], Iterable[str]], **options: Any):
+        self.endpoints = endpoints
+        self.options = options
+        self.schedulers: Dict[Tuple[str, ...], ModelAffinityScheduler] = {}
+
+    def scheduler(self, model: str) -> ModelAffinityScheduler:
+        key = tuple(sorted(self.endpoints(model)))
+        if key not in self.schedulers:
+            self.schedulers[key] = ModelAffinityScheduler(**self.options)
+        return self.schedulers[key]
+
+    def slot(self, model: str):
+        return self.scheduler(model).slot(model)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {",".join(key): scheduler.get_stats() for key, scheduler in self.schedulers.items()}
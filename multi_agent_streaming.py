@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import asyncio
+import atexit
 import datetime
+import hashlib
 import json
 import logging
 import re
@@ -9,25 +11,143 @@ import time
 import multiprocessing
 import warnings
 from pathlib import Path
-from typing import Dict, List, TypedDict, AsyncGenerator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypedDict, AsyncGenerator
 
-import httpx
 import urllib3
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 warnings.filterwarnings("ignore")
 
-from duckduckgo_search import DDGS
-from config import DEBUG, OLLAMA_BASE_URL, MODEL_LLAMA, MODEL_GEMMA
+from config import (
+    DEBUG, OLLAMA_BASE_URL, MODEL_LLAMA, MODEL_GEMMA,
+    OLLAMA_MAX_CONNECTIONS, OLLAMA_KEEPALIVE_CONNECTIONS, OLLAMA_KEEPALIVE_EXPIRY,
+    OLLAMA_CONNECT_TIMEOUT, OLLAMA_FIRST_TOKEN_TIMEOUT, OLLAMA_IDLE_TIMEOUT, OLLAMA_REQUEST_TIMEOUT,
+    OLLAMA_ENDPOINTS, OLLAMA_MODEL_ENDPOINTS, OLLAMA_HEALTH_INTERVAL, OLLAMA_PROBE_TIMEOUT, OLLAMA_RETRY_AFTER,
+    CACHE_TTL, CACHE_STALE_TTL, STAGE_CACHE_MODEL_TTL,
+    CONTEXT_WORKERS, CONTEXT_SEARCH_WORKERS, CONTEXT_MEMORY_TIMEOUT, CONTEXT_SEARCH_TIMEOUT,
+    MODEL_SCHEDULER_ENABLED, MODEL_SCHEDULER_CONCURRENCY, MODEL_SCHEDULER_MAX_WAIT,
+    GENERATION_POLICY, GENERATION_MAX_ACTIVE, GENERATION_STATS_PATH,
+    SEARCH_PROVIDER, SEARCH_FAKE_RESULTS, SEARCH_CACHE_ENABLED, SEARCH_CACHE_TTL,
+    SEARCH_CACHE_NEGATIVE_TTL, SEARCH_CACHE_MAX_ENTRIES,
+    SEARCH_CONTEXT_TOKENS, SEARCH_DEDUPE_THRESHOLD, SEARCH_MINHASH_PERMUTATIONS,
+    PROMPT_MAX_CTX, PROMPT_NUM_PREDICT, PROMPT_MIN_PREDICT, PROMPT_CTX_HEADROOM,
+    OLLAMA_KEEP_ALIVE,
+    SEMANTIC_CACHE_ENABLED, SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_TTL, SEMANTIC_CACHE_MAX_ENTRIES
+)
 from memory_system import ConversationMemory
 from cache_manager import CacheManager
+from context_compressor import ContextCompressor, format_snippet
+from generation_scheduler import GenerationScheduler
+from agent_session import SessionHistory
+from lazy_resource import LazyResource
+from ollama_client import OllamaClientPool, OllamaStatusError, response_metrics
+from ollama_router import OllamaRouter, parse_model_endpoints
+from model_scheduler import BackendSchedulers
+from passage_index import estimate_tokens
+from prompt_builder import PromptBuilder, PromptSection
+from semantic_cache import SemanticCache
+from single_flight import SingleFlight, SharedStream
+from file_cache import SQLiteCache
+from web_search import CachedSearch, create_search_provider
 
 logger = logging.getLogger(__name__)
 QA_MEMORY_PATH = Path("qa_memory.jsonl")
 CPU_THREADS = max(1, int(multiprocessing.cpu_count() * 0.90))
 
-MEMORY = ConversationMemory()
-CACHE = CacheManager(use_redis=True)
+MEMORY = LazyResource("Memory", ConversationMemory)
+CACHE = LazyResource("Cache", lambda: CacheManager(use_redis=True))
+
+def create_semantic_cache() -> SemanticCache:
+    memory = MEMORY.get()
+    return SemanticCache(
+        Path("cache_data") / "semantic_cache.sqlite",
+        encode=memory.encode,
+        dim=memory.embedder.dim,
+        model_name=memory.embedder.name,
+        threshold=SEMANTIC_CACHE_THRESHOLD,
+        ttl=SEMANTIC_CACHE_TTL,
+        max_entries=SEMANTIC_CACHE_MAX_ENTRIES,
+        log_path=Path("cache_data") / "semantic_cache_hits.jsonl"
+    )
+
+SEMANTIC_CACHE = LazyResource("SemanticCache", create_semantic_cache)
+OLLAMA = OllamaClientPool(
+    OLLAMA_BASE_URL,
+    max_connections=OLLAMA_MAX_CONNECTIONS,
+    max_keepalive=OLLAMA_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=OLLAMA_KEEPALIVE_EXPIRY,
+    connect_timeout=OLLAMA_CONNECT_TIMEOUT,
+    first_token_timeout=OLLAMA_FIRST_TOKEN_TIMEOUT,
+    idle_timeout=OLLAMA_IDLE_TIMEOUT,
+    request_timeout=OLLAMA_REQUEST_TIMEOUT
+)
+ROUTER = OllamaRouter(
+    OLLAMA,
+    OLLAMA_ENDPOINTS,
+    model_endpoints=parse_model_endpoints(OLLAMA_MODEL_ENDPOINTS),
+    health_interval=OLLAMA_HEALTH_INTERVAL,
+    probe_timeout=OLLAMA_PROBE_TIMEOUT,
+    retry_after=OLLAMA_RETRY_AFTER
+)
+SCHEDULER = BackendSchedulers(
+    ROUTER.endpoints,
+    max_concurrent=MODEL_SCHEDULER_CONCURRENCY,
+    max_wait=MODEL_SCHEDULER_MAX_WAIT,
+    enabled=MODEL_SCHEDULER_ENABLED
+)
+GENERATIONS = GenerationScheduler(
+    total_threads=CPU_THREADS,
+    max_active=GENERATION_MAX_ACTIVE,
+    policy=GENERATION_POLICY,
+    stats_path=Path(GENERATION_STATS_PATH)
+)
+atexit.register(GENERATIONS.save)
+PROMPT_BUILDER = PromptBuilder(
+    max_ctx=PROMPT_MAX_CTX,
+    num_predict=PROMPT_NUM_PREDICT,
+    min_predict=PROMPT_MIN_PREDICT,
+    headroom=PROMPT_CTX_HEADROOM
+)
+MEMORY_EXECUTOR = ThreadPoolExecutor(max_workers=CONTEXT_WORKERS, thread_name_prefix="context-memory")
+SEARCH_EXECUTOR = ThreadPoolExecutor(max_workers=CONTEXT_SEARCH_WORKERS, thread_name_prefix="context-search")
+PANEL_FLIGHTS = SingleFlight()
+OLLAMA_STREAMS = SharedStream()
+
+def warmup_services() -> None:
+    MEMORY.warmup()
+    CACHE.warmup()
+    if SEMANTIC_CACHE_ENABLED:
+        SEMANTIC_CACHE.warmup()
+
+async def shutdown_services() -> None:
+    await ROUTER.aclose()
+    await OLLAMA.aclose()
+    GENERATIONS.save()
+    if CACHE.ready.is_set():
+        await CACHE.get().aclose()
+    if SEMANTIC_CACHE.ready.is_set():
+        SEMANTIC_CACHE.get().close()
+    if WEB_SEARCH.ready.is_set():
+        WEB_SEARCH.get().close()
+
+def service_stats() -> Dict[str, Any]:
+    return {
+        "generations": GENERATIONS.get_stats(),
+        "scheduler": SCHEDULER.get_stats(),
+        "router": ROUTER.get_stats(),
+        "prompts": PROMPT_BUILDER.get_stats()
+    }
+
+def services_ready() -> bool:
+    return MEMORY.ready.is_set() and CACHE.ready.is_set()
+
+def wait_for_services(timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    for resource in (MEMORY, CACHE):
+        if not resource.ready.wait(max(0.0, deadline - time.monotonic())):
+            return False
+    return True
 
 class PanelResult(TypedDict):
     llama: str
@@ -38,6 +158,12 @@ class PanelResult(TypedDict):
     winner: str
     cache_hit: bool
 
+def request_key(*parts) -> str:
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False, sort_keys=True).encode()).hexdigest()
+
+def is_error_response(text: str) -> bool:
+    return text.startswith("[") and "Hata" in text[:60]
+
 def deduplicate(text: str) -> str:
     parts = [p.strip() for p in text.split("\n\n") if p.strip()]
     out: list[str] = []
@@ -76,103 +202,157 @@ def parse_contribution_scores(decision_text: str) -> Dict[str, float]:
             
     return scores
 
-def search_web(query: str, max_results: int = 5) -> tuple[str, List[str]]:
+def create_web_search() -> CachedSearch:
+    cache = None
+    if SEARCH_CACHE_ENABLED:
+        cache = SQLiteCache(Path("cache_data") / "search_cache.sqlite", max_entries=SEARCH_CACHE_MAX_ENTRIES)
+    return CachedSearch(
+        create_search_provider(SEARCH_PROVIDER, SEARCH_FAKE_RESULTS),
+        cache=cache,
+        ttl=SEARCH_CACHE_TTL,
+        negative_ttl=SEARCH_CACHE_NEGATIVE_TTL
+    )
+
+WEB_SEARCH = LazyResource("WebSearch", create_web_search)
+CONTEXT_COMPRESSOR = ContextCompressor(
+    max_tokens=SEARCH_CONTEXT_TOKENS,
+    threshold=SEARCH_DEDUPE_THRESHOLD,
+    num_perm=SEARCH_MINHASH_PERMUTATIONS
+)
+
+def search_web(query: str, max_results: int = 5, max_tokens: Optional[int] = None,
+               refresh: bool = False) -> tuple[str, List[str]]:
     print(f"\n🔎 İnternette aranıyor: '{query}'...")
     
     BAN_LIST = ["transfermarkt", "mackolik", "futbol", "soccer", "süper lig", "kupası"]
     
+    raw_results, from_cache = WEB_SEARCH.search(query, max(8, max_results), refresh=refresh)
+    if from_cache:
+        print("⚡ Arama sonuçları cache'ten getirildi")
+    
     clean_results = []
-    try:
-        raw_results = DDGS().text(query, max_results=8, region='tr-tr', backend="html")
-        
-        for r in raw_results:
-            text_content = (r['title'] + " " + r['body']).lower()
-            if any(ban in text_content for ban in BAN_LIST):
-                continue
-            clean_results.append(r)
-            if len(clean_results) >= max_results:
-                break
-    except Exception:
-        try:
-            raw_results = DDGS().text(query, max_results=5, region='tr-tr', backend="lite")
-            clean_results = raw_results
-        except Exception:
-            pass
+    for r in raw_results:
+        text_content = (r['title'] + " " + r['body']).lower()
+        if any(ban in text_content for ban in BAN_LIST):
+            continue
+        clean_results.append(r)
 
     if not clean_results:
         print("❌ İlgili sonuç bulunamadı.")
         return "", []
     
-    print(f"✅ {len(clean_results)} adet sonuç bulundu.")
+    header = "🌐 İNTERNET ARAMA SONUÇLARI:\n"
+    budget = (max_tokens or SEARCH_CONTEXT_TOKENS) - estimate_tokens(header)
+    selected = CONTEXT_COMPRESSOR.compress(query, clean_results, max_results=max_results, max_tokens=budget)
+    print(f"✅ {len(selected)} adet sonuç bulundu ({len(clean_results) - len(selected)} tekrar/fazla sonuç elendi).")
     
-    result_list = [f"[{r['title']}]\n{r['body']}" for r in clean_results]
+    result_list = [format_snippet(r) for r in selected]
     
-    context_text = "🌐 İNTERNET ARAMA SONUÇLARI:\n"
-    for i, r in enumerate(clean_results, 1):
-        context_text += f"{i}. [{r['title']}]\n{r['body']}\n\n"
+    context_text = header
+    for i, snippet in enumerate(result_list, 1):
+        context_text += f"{i}. {snippet}\n\n"
     
     return context_text, result_list
 
-async def call_ollama_stream(model_name: str, messages: List[Dict[str, str]], temp: float = 0.0) -> AsyncGenerator[str, None]:
+def ollama_payload(model_name: str, messages: List[Dict[str, str]], temp: float,
+                   num_thread: Optional[int] = None) -> Dict[str, Any]:
+    return {
+        "model": model_name,
+        "messages": messages,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+        "options": {
+            "temperature": temp,
+            **PROMPT_BUILDER.options_for(messages),
+            "num_thread": num_thread or CPU_THREADS
+        }
+    }
+
+async def call_ollama_stream(model_name: str, messages: List[Dict[str, str]], temp: float = 0.0,
+                             metrics: Optional[Dict[str, Any]] = None) -> AsyncGenerator[str, None]:
     try:
-        async with httpx.AsyncClient(timeout=120.0, verify=False, trust_env=False) as client:
-            async with client.stream(
-                "POST",
-                OLLAMA_BASE_URL,
-                json={
-                    "model": model_name,
-                    "messages": messages,
-                    "stream": True,
-                    "options": {
-                        "temperature": temp,
-                        "num_ctx": 8192,
-                        "num_predict": 500,
-                        "num_thread": CPU_THREADS
-                    }
-                }
-            ) as response:
-                if response.status_code != 200:
-                    yield f"[Hata] Sunucu: {response.status_code}"
-                    return
-                
-                async for line in response.aiter_lines():
-                    if line:
-                        try:
-                            data = json.loads(line)
-                            if "message" in data and "content" in data["message"]:
-                                chunk = data["message"]["content"]
-                                if chunk:
-                                    yield chunk
-                        except:
-                            continue
+        async with SCHEDULER.slot(model_name), GENERATIONS.slot() as lease:
+            payload = ollama_payload(model_name, messages, temp, lease.threads)
+            async for data in ROUTER.chat_stream(payload):
+                if data.get("done"):
+                    lease.metrics = response_metrics(data)
+                    if metrics is not None:
+                        metrics.update(lease.metrics)
+                if "message" in data and "content" in data["message"]:
+                    chunk = data["message"]["content"]
+                    if chunk:
+                        yield chunk
     except GeneratorExit:
         return
+    except OllamaStatusError as e:
+        yield f"[Hata] {e}"
     except Exception as e:
         yield f"[Bağlantı Hatası: {e}]"
 
 async def call_ollama(model_name: str, messages: List[Dict[str, str]], temp: float = 0.0) -> str:
     try:
-        async with httpx.AsyncClient(timeout=120.0, verify=False, trust_env=False) as client:
-            response = await client.post(
-                OLLAMA_BASE_URL,
-                json={
-                    "model": model_name,
-                    "messages": messages,
-                    "stream": False,
-                    "options": {
-                        "temperature": temp,
-                        "num_ctx": 8192,
-                        "num_predict": 500,
-                        "num_thread": CPU_THREADS
-                    }
-                }
-            )
-            if response.status_code != 200:
-                return f"[Hata] Sunucu: {response.status_code}"
-            return response.json()["message"]["content"]
+        async with SCHEDULER.slot(model_name), GENERATIONS.slot() as lease:
+            data = await ROUTER.chat(ollama_payload(model_name, messages, temp, num_thread=lease.threads))
+            lease.metrics = response_metrics(data)
+        return data["message"]["content"]
     except Exception as e:
         return f"[Hata] {e}"
 
+async def cached_stage(cache: Optional[CacheManager], stage: str, parts: tuple, ttl: int,
+                       compute: Callable[[], Awaitable[Dict[str, Any]]], refresh: bool = False) -> Dict[str, Any]:
+    if cache is None:
+        return await compute()
+    
+    key = request_key(*parts)
+    if not refresh:
+        cached = await cache.aget(key, f"stage:{stage}")
+        if cached is not None:
+            print(f"⚡ {stage} aşaması cache'ten getirildi")
+            return cached
+    
+    value = await compute()
+    if any(value.values()) and not is_error_response(value.get("text", "")):
+        await cache.aset(key, f"stage:{stage}", value, ttl=ttl)
+    return value
+
+async def run_with_deadline(name: str, func: Callable[[], Any], timeout: float, default: Any,
+                            executor: ThreadPoolExecutor = MEMORY_EXECUTOR) -> tuple[Any, float]:
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(loop.run_in_executor(executor, func), timeout)
+    except asyncio.TimeoutError:
+        print(f"⏱️ {name} {timeout:g}s içinde tamamlanamadı, atlanıyor")
+        result = default
+    except Exception as e:
+        print(f"⚠️ {name} hatası: {e}")
+        result = default
+    return result, time.perf_counter() - start
+
+async def search_context(query: str, max_results: int = 5, max_tokens: Optional[int] = None,
+                         refresh: bool = False) -> tuple[str, List[str]]:
+    result, _ = await run_with_deadline(
+        "Web arama", lambda: search_web(query, max_results=max_results, max_tokens=max_tokens, refresh=refresh),
+        CONTEXT_SEARCH_TIMEOUT, ("", []), executor=SEARCH_EXECUTOR
+    )
+    return result
+
+async def gather_context(query: str, max_results: int = 5, refresh: bool = False) -> Dict[str, Any]:
+    async def memory_source() -> tuple[str, float]:
+        return await run_with_deadline("Hafıza", lambda: MEMORY.search_relevant_context(query), CONTEXT_MEMORY_TIMEOUT, "")
+    
+    async def search_source() -> tuple[tuple[str, List[str]], float]:
+        start = time.perf_counter()
+        result = await search_context(query, max_results=max_results, refresh=refresh)
+        return result, time.perf_counter() - start
+    
+    (memory_context, memory_time), ((search, results), search_time) = await asyncio.gather(memory_source(), search_source())
+    return {
+        "memory": memory_context,
+        "search": search,
+        "results": results,
+        "latency": {"memory": memory_time, "search": search_time}
+    }
+
 class LocalAgent:
     def __init__(self, name: str, model_name: str, system_prompt: str):
         self.name = name
@@ -194,12 +374,52 @@ class LocalAgent:
             {"role": "system", "content": self.system_prompt},
             {"role": "user", "content": msg}
         ]
-        async for chunk in call_ollama_stream(self.model_name, messages, temp=temp_override):
-            yield chunk
+        key = request_key(self.model_name, messages, temp_override)
+        stream = OLLAMA_STREAMS.stream(key, lambda: call_ollama_stream(self.model_name, messages, temp=temp_override))
+        try:
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+    
+    def session(self) -> "AgentSession":
+        return AgentSession(self)
+
+class AgentSession:
+    def __init__(self, agent: LocalAgent):
+        self.agent = agent
+        self.history = SessionHistory(agent.system_prompt, PROMPT_BUILDER.prompt_budget)
+        self.rounds: List[Dict[str, Any]] = []
+    
+    async def think_stream(self, msg: str, temp_override: float = 0.0) -> AsyncGenerator[str, None]:
+        messages = self.history.begin(msg)
+        metrics: Dict[str, Any] = {}
+        response = ""
+        try:
+            async for chunk in call_ollama_stream(self.agent.model_name, messages, temp=temp_override,
+                                                  metrics=metrics):
+                response += chunk
+                yield chunk
+        finally:
+            if response and not is_error_response(response):
+                self.history.commit(response)
+            else:
+                self.history.rollback()
+            if metrics:
+                self.rounds.append(metrics)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        prefill_ms = [round(m.get("prompt_eval_duration", 0) / 1e6, 1) for m in self.rounds]
+        return {
+            **self.history.get_stats(),
+            "prefill_tokens": [m.get("prompt_eval_count", 0) for m in self.rounds],
+            "prefill_ms": prefill_ms
+        }
 
 class MultiModelOrchestrator:
     def __init__(self):
         self.history: List[Dict[str, str]] = []
+        self._background: set = set()
         
         self.llama_chat = LocalAgent(
             "Qwen 2.5", MODEL_LLAMA,
@@ -264,44 +484,83 @@ Qwen'in cevabını analiz et ve şunları yap:
 
     async def ask_panel_async(self, msg: str) -> PanelResult:
         cache_key = msg.strip().lower()
-        cached_result = CACHE.get(cache_key, "panel")
+        cache = await CACHE.get_async()
+        cached_result, stale = await cache.aget_swr(cache_key, "panel")
         
         if cached_result:
-            print("⚡ Cache'ten getiriliyor...")
+            if stale:
+                print("♻️ Süresi dolmuş cevap sunuluyor, arka planda yenileniyor...")
+                self._revalidate(msg, cache_key, cache)
+            else:
+                print("⚡ Cache'ten getiriliyor...")
             cached_result["cache_hit"] = True
             return cached_result
         
-        response_times: Dict[str, float] = {}
-        
-        memory_context = MEMORY.search_relevant_context(msg)
-        search_context, _ = search_web(msg, max_results=5)
-        
-        qwen_full_prompt = ""
-        if memory_context:
-            qwen_full_prompt += f"{memory_context}\n{'='*60}\n\n"
-        if search_context:
-            qwen_full_prompt += f"{search_context}\n{'='*60}\n\n"
-        qwen_full_prompt += f"KULLANICI SORUSU: {msg}\n\nYukarıdaki bilgileri kullanarak en iyi cevabı ver."
-        
-        llama_resp, t = await timed("Qwen 2.5", self.llama_chat.think(qwen_full_prompt))
-        response_times["llama"] = t
+        if PANEL_FLIGHTS.in_flight(cache_key):
+            print("⏳ Aynı soru zaten işleniyor, sonuç bekleniyor...")
+        result = await PANEL_FLIGHTS.run(cache_key, lambda: self._run_panel(msg, cache_key, cache))
+        return dict(result)
+    
+    def _revalidate(self, msg: str, cache_key: str, cache: CacheManager) -> None:
+        if PANEL_FLIGHTS.in_flight(cache_key):
+            return
+        task = asyncio.ensure_future(
+            PANEL_FLIGHTS.run(cache_key, lambda: self._run_panel(msg, cache_key, cache, refresh=True))
+        )
+        self._background.add(task)
+        task.add_done_callback(self._revalidated)
+    
+    def _revalidated(self, task: asyncio.Future) -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"⚠️ Arka plan yenileme hatası: {task.exception()}")
+    
+    async def _agent_stage(self, cache: CacheManager, agent: LocalAgent, prompt: str, refresh: bool) -> tuple[str, float]:
+        started = time.perf_counter()
         
-        gemma_prompt = f"📌 KULLANICI SORUSU: {msg}\n\n🔵 QWEN'İN CEVABI:\n{llama_resp}\n\n{'='*60}\n"
-        final_resp, t = await timed("Gemma 2", self.gemma_chat.think(gemma_prompt))
-        response_times["gemma"] = t
+        async def compute() -> Dict[str, Any]:
+            text, _ = await timed(agent.name, agent.think(prompt))
+            return {"text": text}
         
+        value = await cached_stage(
+            cache, agent.name, (agent.model_name, agent.system_prompt, prompt), STAGE_CACHE_MODEL_TTL, compute, refresh
+        )
+        return value["text"], time.perf_counter() - started
+    
+    async def _semantic_match(self, semantic_cache: Optional[SemanticCache], msg: str) -> Optional[PanelResult]:
+        if semantic_cache is None:
+            return None
+        match = await asyncio.to_thread(semantic_cache.lookup, msg.strip())
+        if not match:
+            return None
+        print(f"⚡ Benzer soru cache'ten getiriliyor ({match['similarity']:.2f})")
+        cached_result = match["response"]
+        cached_result["cache_hit"] = True
+        return cached_result
+    
+    def _qwen_prompt(self, msg: str, context: Dict[str, Any]) -> str:
+        return PROMPT_BUILDER.build([
+            PromptSection("memory", context["memory"], priority=2),
+            PromptSection("search", context["search"], priority=1),
+            PromptSection("question", f"KULLANICI SORUSU: {msg}\n\nYukarıdaki bilgileri kullanarak en iyi cevabı ver.", required=True)
+        ], reserved_tokens=estimate_tokens(self.llama_chat.system_prompt))
+    
+    def _gemma_prompt(self, msg: str, llama_resp: str) -> str:
+        return f"📌 KULLANICI SORUSU: {msg}\n\n🔵 QWEN'İN CEVABI:\n{llama_resp}\n\n{'='*60}\n"
+    
+    async def _finish_panel(self, msg: str, cache_key: str, cache: CacheManager, semantic_cache: Optional[SemanticCache],
+                            context: Dict[str, Any], llama_resp: str, final_resp: str,
+                            response_times: Dict[str, float], refresh: bool = False) -> PanelResult:
         contribution_scores = parse_contribution_scores(final_resp)
         winner = "Gemma" if not contribution_scores else max(contribution_scores, key=contribution_scores.get)
         
         final_llama_text = deduplicate(llama_resp)
         sources = []
-        if memory_context: sources.append("Geçmiş Konuşmalar")
-        if search_context: sources.append("DuckDuckGo")
+        if context["memory"]: sources.append("Geçmiş Konuşmalar")
+        if context["search"]: sources.append("DuckDuckGo")
         if not sources: sources.append("Qwen Dahili Hafıza")
         final_llama_text += f"\n\n🔍 [Kaynaklar: {', '.join(sources)}]"
         
-        MEMORY.add_conversation(user_msg=msg, qwen_resp=llama_resp, gemma_resp=final_resp, final_answer=deduplicate(final_resp))
-        
         result = {
             "llama": final_llama_text,
             "gemma": deduplicate(final_resp),
@@ -312,10 +571,74 @@ Qwen'in cevabını analiz et ve şunları yap:
             "cache_hit": False
         }
         
-        CACHE.set(cache_key, "panel", result, ttl=3600)
+        if is_error_response(llama_resp) or is_error_response(final_resp):
+            return result
+        
+        if not refresh:
+            await (await MEMORY.get_async()).add_conversation_async(user_msg=msg, qwen_resp=llama_resp, gemma_resp=final_resp, final_answer=deduplicate(final_resp))
+        await cache.aset(cache_key, "panel", result, ttl=CACHE_TTL, stale=CACHE_STALE_TTL)
+        if semantic_cache is not None:
+            await asyncio.to_thread(semantic_cache.add, msg.strip(), result)
         
         return result
     
+    async def _run_panel(self, msg: str, cache_key: str, cache: CacheManager, refresh: bool = False) -> PanelResult:
+        semantic_cache = await SEMANTIC_CACHE.get_async() if SEMANTIC_CACHE_ENABLED else None
+        if not refresh:
+            cached_result = await self._semantic_match(semantic_cache, msg)
+            if cached_result:
+                return cached_result
+        
+        context = await gather_context(msg, max_results=5, refresh=refresh)
+        response_times: Dict[str, float] = dict(context["latency"])
+        
+        llama_resp, response_times["llama"] = await self._agent_stage(cache, self.llama_chat, self._qwen_prompt(msg, context), refresh)
+        final_resp, response_times["gemma"] = await self._agent_stage(cache, self.gemma_chat, self._gemma_prompt(msg, llama_resp), refresh)
+        
+        return await self._finish_panel(msg, cache_key, cache, semantic_cache, context, llama_resp, final_resp, response_times, refresh)
+    
+    async def ask_panel_batch(self, questions: List[str]) -> List[PanelResult]:
+        cache = await CACHE.get_async()
+        semantic_cache = await SEMANTIC_CACHE.get_async() if SEMANTIC_CACHE_ENABLED else None
+        keys = [question.strip().lower() for question in questions]
+        results: List[Optional[PanelResult]] = [None] * len(questions)
+        
+        pending: Dict[str, List[int]] = {}
+        for i, (key, cached_result) in enumerate(zip(keys, await cache.aget_many(keys, "panel"))):
+            if cached_result:
+                cached_result["cache_hit"] = True
+                results[i] = cached_result
+            else:
+                pending.setdefault(key, []).append(i)
+        
+        for key in list(pending):
+            cached_result = await self._semantic_match(semantic_cache, questions[pending[key][0]])
+            if cached_result:
+                for i in pending.pop(key):
+                    results[i] = dict(cached_result)
+        
+        if pending:
+            first = [indices[0] for indices in pending.values()]
+            print(f"📦 {len(first)} soru toplu işleniyor ({len(questions) - sum(map(len, pending.values()))} cache'ten)")
+            contexts = await asyncio.gather(*(gather_context(questions[i], max_results=5) for i in first))
+            qwen = await asyncio.gather(*(
+                self._agent_stage(cache, self.llama_chat, self._qwen_prompt(questions[i], context), False)
+                for i, context in zip(first, contexts)
+            ))
+            gemma = await asyncio.gather(*(
+                self._agent_stage(cache, self.gemma_chat, self._gemma_prompt(questions[i], llama_resp), False)
+                for i, (llama_resp, _) in zip(first, qwen)
+            ))
+            
+            for (key, indices), context, (llama_resp, llama_time), (final_resp, gemma_time) in zip(pending.items(), contexts, qwen, gemma):
+                response_times = {**context["latency"], "llama": llama_time, "gemma": gemma_time}
+                result = await self._finish_panel(questions[indices[0]], key, cache, semantic_cache, context,
+                                                  llama_resp, final_resp, response_times)
+                for i in indices:
+                    results[i] = dict(result)
+        
+        return results
+    
     async def compare_async(self, topic: str, text1: str, text2: str) -> PanelResult:
         response_times: Dict[str, float] = {}
         
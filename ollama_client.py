@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, AsyncGenerator, Dict, Optional
+
+import httpx
+
+METRIC_KEYS = ("total_duration", "load_duration", "prompt_eval_count", "prompt_eval_duration",
+               "eval_count", "eval_duration")
+
+def response_metrics(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: data[key] for key in METRIC_KEYS if key in data}
+
+class OllamaStatusError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"Sunucu: {status_code}")
+        self.status_code = status_code
+
+class OllamaTimeout(Exception):
+    pass
+
+class OllamaClientPool:
+    def __init__(self, base_url: str, max_connections: int = 8, max_keepalive: int = 8,
+                 keepalive_expiry: float = 300.0, connect_timeout: float = 5.0,
+                 first_token_timeout: float = 120.0, idle_timeout: float = 30.0,
+                 request_timeout: float = 300.0):
+        self.base_url = base_url
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.connect_timeout = connect_timeout
+        self.first_token_timeout = first_token_timeout
+        self.idle_timeout = idle_timeout
+        self.request_timeout = request_timeout
+        self.stats = {"requests": 0, "streams": 0, "timeouts": 0, "clients_created": 0}
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=httpx.Timeout(self.request_timeout, connect=self.connect_timeout, pool=self.request_timeout),
+                verify=False,
+                trust_env=False
+            )
+            self._loop = loop
+            self.stats["clients_created"] += 1
+        return self._client
+
+    async def chat(self, payload: Dict[str, Any], url: Optional[str] = None) -> Dict[str, Any]:
+        self.stats["requests"] += 1
+        response = await self.client().post(url or self.base_url, json={**payload, "stream": False})
+        if response.status_code != 200:
+            raise OllamaStatusError(response.status_code)
+        return response.json()
+
+    async def chat_stream(self, payload: Dict[str, Any], url: Optional[str] = None) -> AsyncGenerator[Dict[str, Any], None]:
+        self.stats["streams"] += 1
+        timeout = httpx.Timeout(None, connect=self.connect_timeout, pool=self.request_timeout)
+        async with self.client().stream("POST", url or self.base_url, json={**payload, "stream": True},
+                                        timeout=timeout) as response:
+            if response.status_code != 200:
+                raise OllamaStatusError(response.status_code)
+
+            lines = response.aiter_lines()
+            wait, phase = self.first_token_timeout, "ilk token"
+            while True:
+                try:
+                    line = await asyncio.wait_for(lines.__anext__(), wait)
+                except StopAsyncIteration:
+                    return
+                except asyncio.TimeoutError:
+                    self.stats["timeouts"] += 1
+                    raise OllamaTimeout(f"{phase} zaman aşımı ({wait:g}s)")
+
+                if not line:
+                    continue
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    continue
+                wait, phase = self.idle_timeout, "parça arası"
+                yield data
+
+    async def aclose(self) -> None:
+        if self._client is not None and self._loop is asyncio.get_running_loop():
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
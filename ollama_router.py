@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional, Set
+
+import httpx
+
+from ollama_client import OllamaClientPool, OllamaStatusError, OllamaTimeout
+
+RETRYABLE_ERRORS = (httpx.TransportError, OllamaTimeout, asyncio.TimeoutError)
+
+def parse_model_endpoints(spec: str) -> Dict[str, List[str]]:
+    mapping: Dict[str, List[str]] = {}
+    for part in spec.split(";"):
+        if "=" not in part:
+            continue
+        model, urls = part.split("=", 1)
+        mapping[model.strip()] = [url.strip() for url in urls.split(",") if url.strip()]
+    return mapping
+
+def model_aliases(name: str) -> Set[str]:
+    if ":" in name:
+        base, tag = name.split(":", 1)
+        return {name, base} if tag == "latest" else {name}
+    return {name, f"{name}:latest"}
+
+class OllamaBackend:
+    def __init__(self, url: str):
+        self.url = url
+        self.root = url.rsplit("/api/", 1)[0]
+        self.healthy = True
+        self.models: Optional[Set[str]] = None
+        self.outstanding = 0
+        self.latency = 0.0
+        self.failures = 0
+        self.down_until = 0.0
+
+    def available(self, now: float) -> bool:
+        return self.healthy or now >= self.down_until
+
+    def serves(self, model: str) -> bool:
+        return self.models is None or bool(model_aliases(model) & self.models)
+
+    def record_latency(self, elapsed: float) -> None:
+        self.latency = elapsed if self.latency == 0 else 0.8 * self.latency + 0.2 * elapsed
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "latency": round(self.latency, 3),
+            "failures": self.failures,
+            "models": sorted(self.models) if self.models is not None else None
+        }
+
+class OllamaRouter:
+    def __init__(self, pool: OllamaClientPool, endpoints: List[str],
+                 model_endpoints: Optional[Dict[str, List[str]]] = None,
+                 health_interval: float = 15.0, probe_timeout: float = 2.0, retry_after: float = 10.0):
+        self.pool = pool
+        self.health_interval = health_interval
+        self.probe_timeout = probe_timeout
+        self.retry_after = retry_after
+        self.default_endpoints = list(endpoints)
+        self.model_endpoints = model_endpoints or {}
+        self.stats = {"dispatched": 0, "failovers": 0, "probes": 0}
+
+        self.backends: Dict[str, OllamaBackend] = {}
+        for url in self.default_endpoints + [url for urls in self.model_endpoints.values() for url in urls]:
+            self.backends.setdefault(url, OllamaBackend(url))
+
+        self._health_task: Optional[asyncio.Task] = None
+
+    def _ensure_health_task(self) -> None:
+        if self.health_interval <= 0 or len(self.backends) < 2:
+            return
+        if self._health_task is None or self._health_task.done() or \
+                self._health_task.get_loop() is not asyncio.get_running_loop():
+            self._health_task = asyncio.ensure_future(self._health_loop())
+
+    async def _health_loop(self) -> None:
+        while True:
+            await self.probe_all()
+            await asyncio.sleep(self.health_interval)
+
+    async def probe(self, backend: OllamaBackend) -> bool:
+        self.stats["probes"] += 1
+        try:
+            response = await self.pool.client().get(f"{backend.root}/api/tags", timeout=self.probe_timeout)
+            response.raise_for_status()
+            backend.models = {model["name"] for model in response.json().get("models", [])}
+            self._mark_up(backend)
+        except Exception:
+            self._mark_down(backend)
+        return backend.healthy
+
+    async def probe_all(self) -> Dict[str, bool]:
+        backends = list(self.backends.values())
+        results = await asyncio.gather(*(self.probe(backend) for backend in backends))
+        return {backend.url: healthy for backend, healthy in zip(backends, results)}
+
+    def _mark_up(self, backend: OllamaBackend) -> None:
+        if not backend.healthy:
+            print(f"✅ Ollama düğümü tekrar erişilebilir: {backend.root}")
+        backend.healthy = True
+        backend.failures = 0
+
+    def _mark_down(self, backend: OllamaBackend) -> None:
+        if backend.healthy:
+            print(f"⚠️ Ollama düğümü devre dışı: {backend.root}")
+        backend.healthy = False
+        backend.failures += 1
+        backend.down_until = time.monotonic() + self.retry_after
+
+    def endpoints(self, model: str) -> List[str]:
+        return self.model_endpoints.get(model) or self.default_endpoints
+
+    def candidates(self, model: str, exclude: Set[str] = frozenset()) -> List[OllamaBackend]:
+        backends = [self.backends[url] for url in self.endpoints(model) if url not in exclude]
+        now = time.monotonic()
+
+        ready = [backend for backend in backends if backend.available(now) and backend.serves(model)]
+        if not ready:
+            ready = [backend for backend in backends if backend.serves(model)] or backends
+        return sorted(ready, key=lambda backend: (backend.outstanding, backend.latency))
+
+    def _next(self, model: str, tried: Set[str]) -> Optional[OllamaBackend]:
+        candidates = self.candidates(model, tried)
+        return candidates[0] if candidates else None
+
+    def _handle_failure(self, backend: OllamaBackend, model: str, error: Exception) -> bool:
+        if isinstance(error, OllamaStatusError):
+            if error.status_code == 404 and backend.models is not None:
+                backend.models -= model_aliases(model)
+                return True
+            if error.status_code < 500:
+                return False
+        self._mark_down(backend)
+        return True
+
+    async def chat(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        self._ensure_health_task()
+        model = payload["model"]
+        tried: Set[str] = set()
+
+        while True:
+            backend = self._next(model, tried)
+            if backend is None:
+                raise RuntimeError(f"{model} için erişilebilir Ollama düğümü yok")
+            tried.add(backend.url)
+            self.stats["dispatched"] += 1
+
+            backend.outstanding += 1
+            start = time.perf_counter()
+            try:
+                data = await self.pool.chat(payload, url=backend.url)
+            except (OllamaStatusError, *RETRYABLE_ERRORS) as e:
+                if not self._handle_failure(backend, model, e) or self._next(model, tried) is None:
+                    raise
+                self.stats["failovers"] += 1
+                continue
+            finally:
+                backend.outstanding -= 1
+
+            backend.record_latency(time.perf_counter() - start)
+            self._mark_up(backend)
+            return data
+
+    async def chat_stream(self, payload: Dict[str, Any]) -> AsyncGenerator[Dict[str, Any], None]:
+        self._ensure_health_task()
+        model = payload["model"]
+        tried: Set[str] = set()
+
+        while True:
+            backend = self._next(model, tried)
+            if backend is None:
+                raise RuntimeError(f"{model} için erişilebilir Ollama düğümü yok")
+            tried.add(backend.url)
+            self.stats["dispatched"] += 1
+
+            backend.outstanding += 1
+            start = time.perf_counter()
+            started = False
+            stream = self.pool.chat_stream(payload, url=backend.url)
+            try:
+                async for data in stream:
+                    if not started:
+                        backend.record_latency(time.perf_counter() - start)
+                        started = True
+                    yield data
+                self._mark_up(backend)
+                return
+            except (OllamaStatusError, *RETRYABLE_ERRORS) as e:
+                if not self._handle_failure(backend, model, e) or started or self._next(model, tried) is None:
+                    raise
+                self.stats["failovers"] += 1
+            finally:
+                backend.outstanding -= 1
+                await stream.aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "backends": [backend.as_dict() for backend in self.backends.values()]}
+
+    async def aclose(self) -> None:
+        if self._health_task is not None and not self._health_task.done():
+            self._health_task.cancel()
+        self._health_task = None
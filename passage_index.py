@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import re
+import struct
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from embedding_store import EmbeddingStore
+from vector_index import create_index
+
+PASSAGE_FIELDS = ("final", "qwen", "gemma")
+PASSAGE_RECORD = struct.Struct("<IIII")
+SENTENCE_PATTERN = re.compile(r"[^\n.!?]+[.!?]*")
+
+CHARS_PER_TOKEN = 3
+
+def estimate_tokens(text: str) -> int:
+    return max(1, -(-len(text) // CHARS_PER_TOKEN))
+
+def chunk_spans(text: str, max_words: int = 60) -> List[tuple[int, int]]:
+    spans: List[tuple[int, int]] = []
+    start = end = None
+    words = 0
+
+    for match in SENTENCE_PATTERN.finditer(text):
+        sentence_words = len(match.group().split())
+        if sentence_words == 0:
+            continue
+        if start is not None and words + sentence_words > max_words:
+            spans.append((start, end))
+            start = None
+            words = 0
+        if start is None:
+            start = match.start()
+        end = match.end()
+        words += sentence_words
+
+    if start is not None:
+        spans.append((start, end))
+    return spans
+
+class PassageIndex:
+    def __init__(self, base_path: Path, dim: int, model_name: str, index_kind: str,
+                 max_words: int = 60, storage: str = "float32", **index_options):
+        base_path = Path(base_path)
+        self.records_path = base_path.with_suffix(".passages")
+        self.max_words = max_words
+        self.store = EmbeddingStore(base_path.with_suffix(".pemb"), dim=dim, model_name=model_name, storage=storage)
+
+        self._load_records()
+        self.index = create_index(index_kind, self.store, base_path.with_suffix(".pidx"), **index_options)
+
+    def _load_records(self) -> None:
+        raw = self.records_path.read_bytes() if self.records_path.exists() and not self.store.rebuilt else b""
+        consistent = len(raw) == len(self.store) * PASSAGE_RECORD.size
+        rows = min(len(raw) // PASSAGE_RECORD.size, len(self.store))
+        records = np.frombuffer(raw[:rows * PASSAGE_RECORD.size], dtype=np.uint32).reshape(rows, 4)
+
+        if rows and not consistent:
+            last_entry = records[-1, 0]
+            rows = int(np.searchsorted(records[:, 0], last_entry))
+            records = records[:rows]
+
+        if not consistent:
+            with self.records_path.open("wb") as f:
+                f.write(records.tobytes())
+            self.store.truncate(rows)
+        self.records = records.copy()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def covered_entries(self) -> int:
+        return int(self.records[-1, 0]) + 1 if len(self.records) else 0
+
+    def chunk_entry(self, entry_id: int, entry: Dict) -> tuple[List[List[int]], List[str]]:
+        records: List[List[int]] = []
+        texts: List[str] = []
+        seen = set()
+
+        for field_index, field in enumerate(PASSAGE_FIELDS):
+            text = entry.get(field) or ""
+            for start, end in chunk_spans(text, self.max_words):
+                passage = text[start:end].strip()
+                if passage in seen:
+                    continue
+                seen.add(passage)
+                records.append([entry_id, field_index, start, end])
+                texts.append(passage)
+
+        return records, texts
+
+    def add_entries(self, first_id: int, entries: List[Dict], encode: Callable[[List[str]], np.ndarray]) -> None:
+        records: List[List[int]] = []
+        texts: List[str] = []
+        for offset, entry in enumerate(entries):
+            entry_records, entry_texts = self.chunk_entry(first_id + offset, entry)
+            records.extend(entry_records)
+            texts.extend(entry_texts)
+
+        if not records:
+            return
+
+        start = len(self.store)
+        vectors = encode(texts)
+        self.store.append(vectors)
+
+        new_records = np.asarray(records, dtype=np.uint32)
+        with self.records_path.open("ab") as f:
+            f.write(new_records.tobytes())
+        self.records = np.concatenate([self.records, new_records])
+        self.index.add(start, vectors)
+
+    def truncate_entries(self, entries: int) -> None:
+        rows = self.first_passage(entries)
+        if rows >= len(self.records):
+            return
+
+        self.records = self.records[:rows].copy()
+        with self.records_path.open("wb") as f:
+            f.write(self.records.tobytes())
+        self.store.truncate(rows)
+        self.index.truncate(rows)
+
+    def passage_text(self, passage_id: int, entry: Dict) -> str:
+        _, field_index, start, end = self.records[passage_id]
+        return (entry.get(PASSAGE_FIELDS[field_index]) or "")[start:end].strip()
+
+    def entry_of(self, passage_id: int) -> int:
+        return int(self.records[passage_id, 0])
+
+    def passages_for_entry(self, entry_id: int) -> np.ndarray:
+        entry_ids = self.records[:, 0]
+        lo = np.searchsorted(entry_ids, entry_id, side="left")
+        hi = np.searchsorted(entry_ids, entry_id, side="right")
+        return np.arange(lo, hi)
+
+    def first_passage(self, entry_id: int) -> int:
+        return int(np.searchsorted(self.records[:, 0], entry_id, side="left"))
+
+    def search(self, query: np.ndarray, top_k: int, min_entry: int = 0) -> tuple[np.ndarray, np.ndarray]:
+        return self.index.search(query, top_k, min_id=self.first_passage(min_entry))
+
+    def similarities(self, query: np.ndarray, passage_ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        passage_ids = passage_ids[passage_ids < len(self.store)]
+        return passage_ids, self.store.dot_ids(query, passage_ids)
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List
+
+from passage_index import CHARS_PER_TOKEN, estimate_tokens
+
+MESSAGE_OVERHEAD = 8
+
+class PromptSection:
+    def __init__(self, name: str, text: str, priority: int = 0, required: bool = False):
+        self.name = name
+        self.text = text
+        self.priority = priority
+        self.required = required
+
+def trim_to_tokens(text: str, tokens: int) -> str:
+    limit = tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text.rfind("\n", 0, limit)
+    if cut < limit // 2:
+        cut = text.rfind(" ", 0, limit)
+    return text[:cut if cut > 0 else limit].rstrip() + " …"
+
+class PromptBuilder:
+    def __init__(self, max_ctx: int = 8192, num_predict: int = 500, min_predict: int = 128,
+                 headroom: int = 256, separator: str = f"\n{'=' * 60}\n\n"):
+        self.max_ctx = max_ctx
+        self.headroom = headroom
+        self.num_predict = num_predict
+        self.min_predict = min_predict
+        self.separator = separator
+        self._lock = threading.Lock()
+        self.stats = {"prompts": 0, "requests": 0, "prompt_tokens": 0, "trimmed_tokens": 0,
+                      "sections_trimmed": 0, "sections_dropped": 0, "predict_clamped": 0,
+                      "overflows": 0}
+
+    @property
+    def usable_ctx(self) -> int:
+        return self.max_ctx - self.headroom
+
+    @property
+    def prompt_budget(self) -> int:
+        return self.usable_ctx - self.num_predict
+
+    def build(self, sections: List[PromptSection], reserved_tokens: int = 0) -> str:
+        sections = [section for section in sections if section.text]
+        texts = [section.text for section in sections]
+        sizes = [estimate_tokens(text) for text in texts]
+        budget = self.prompt_budget - reserved_tokens - MESSAGE_OVERHEAD
+        overflow = sum(sizes) + estimate_tokens(self.separator) * (len(sections) - 1) - budget
+
+        trimmed_tokens = trimmed = dropped = 0
+        for i in sorted(range(len(sections)), key=lambda i: sections[i].priority):
+            if overflow <= 0:
+                break
+            if sections[i].required:
+                continue
+            keep = sizes[i] - overflow
+            if keep < 32:
+                texts[i] = ""
+                overflow -= sizes[i]
+                trimmed_tokens += sizes[i]
+                dropped += 1
+            else:
+                texts[i] = trim_to_tokens(texts[i], keep)
+                trimmed_tokens += overflow
+                overflow = 0
+                trimmed += 1
+
+        with self._lock:
+            self.stats["prompts"] += 1
+            self.stats["trimmed_tokens"] += trimmed_tokens
+            self.stats["sections_trimmed"] += trimmed
+            self.stats["sections_dropped"] += dropped
+
+        return self.separator.join(text for text in texts if text)
+
+    def options_for(self, messages: List[Dict[str, str]]) -> Dict[str, int]:
+        prompt_tokens = sum(estimate_tokens(message["content"]) + MESSAGE_OVERHEAD for message in messages)
+        num_predict = self.num_predict
+        if prompt_tokens + num_predict > self.usable_ctx:
+            num_predict = max(self.min_predict, self.usable_ctx - prompt_tokens)
+        overflow = prompt_tokens + num_predict > self.usable_ctx
+        if overflow:
+            print(f"⚠️ İstem (~{prompt_tokens} token) bağlam penceresini ({self.max_ctx}) aşıyor, model baştan kesecek")
+
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["prompt_tokens"] += prompt_tokens
+            self.stats["predict_clamped"] += num_predict < self.num_predict
+            self.stats["overflows"] += overflow
+
+        return {"num_ctx": self.max_ctx, "num_predict": num_predict}
+
+    def get_stats(self) -> Dict[str, Any]:
+        requests = self.stats["requests"]
+        return {
+            **self.stats,
+            "avg_prompt_tokens": round(self.stats["prompt_tokens"] / requests, 1) if requests else 0.0
+        }
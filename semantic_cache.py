@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from embedding_store import EmbeddingStore
+from security_utils import SecurityFilter
+
+class SemanticCache:
+    def __init__(self, path: Path, encode: Callable[[List[str]], np.ndarray], dim: int, model_name: str,
+                 threshold: float = 0.92, ttl: float = 3600, max_entries: int = 5000,
+                 log_path: Optional[Path] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.encode = encode
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.log_path = Path(log_path) if log_path is not None else None
+        self.security = SecurityFilter()
+        self.stats = {"hits": 0, "misses": 0, "near_misses": 0, "compactions": 0}
+
+        self._lock = threading.Lock()
+        self.store = EmbeddingStore(self.path.with_suffix(".emb"), dim=dim, model_name=model_name)
+
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "row INTEGER PRIMARY KEY, query TEXT NOT NULL, response TEXT NOT NULL, "
+            "created REAL NOT NULL, expires REAL NOT NULL)"
+        )
+        if self.store.rebuilt:
+            self._db.execute("DELETE FROM entries")
+        self._db.commit()
+        self._load()
+
+    def _load(self) -> None:
+        rows = len(self.store)
+        self._db.execute("DELETE FROM entries WHERE row >= ?", (rows,))
+        self._db.commit()
+
+        self.expires = np.zeros(rows, dtype=np.float64)
+        for row, expires in self._db.execute("SELECT row, expires FROM entries"):
+            self.expires[row] = expires
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.expires > time.time()))
+
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        query = self.security.sanitize_text(query)
+        vector = self.encode([query])[0]
+        now = time.time()
+
+        with self._lock:
+            live = np.flatnonzero(self.expires > now)
+            if len(live) == 0:
+                self.stats["misses"] += 1
+                return None
+
+            scores = self.store.dot_ids(vector, live)
+            best = int(np.argmax(scores))
+            row, similarity = int(live[best]), float(scores[best])
+            matched, response = self._db.execute(
+                "SELECT query, response FROM entries WHERE row = ?", (row,)
+            ).fetchone()
+
+        hit = similarity >= self.threshold
+        if hit:
+            self.stats["hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            if similarity >= self.threshold - 0.1:
+                self.stats["near_misses"] += 1
+        self._log(query, matched, similarity, hit)
+
+        if not hit:
+            return None
+        return {"response": json.loads(response), "query": matched, "similarity": similarity}
+
+    def add(self, query: str, response: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        query = self.security.sanitize_text(query)
+        response = {key: self.security.sanitize_text(value) if isinstance(value, str) else value
+                    for key, value in response.items()}
+        vector = self.encode([query])
+        now = time.time()
+        expires = now + (self.ttl if ttl is None else ttl)
+
+        with self._lock:
+            if len(self.expires) >= self.max_entries:
+                self._compact(now)
+
+            row = len(self.store)
+            self.store.append(vector)
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (row, query, response, created, expires) VALUES (?, ?, ?, ?, ?)",
+                (row, query, json.dumps(response, ensure_ascii=False), now, expires)
+            )
+            self._db.commit()
+            self.expires = np.append(self.expires, expires)
+
+    def _compact(self, now: float) -> None:
+        live = np.flatnonzero(self.expires > now)
+        keep = int(self.max_entries * 0.9)
+        if len(live) > keep:
+            live = np.sort(live[np.argsort(self.expires[live])[len(live) - keep:]])
+
+        vectors = self.store.take(live)
+        entries = {
+            row: (query, response, created, expires)
+            for row, query, response, created, expires in self._db.execute(
+                "SELECT row, query, response, created, expires FROM entries WHERE expires > ?", (now,)
+            )
+        }
+
+        self.store.truncate(0)
+        self.store.append(vectors)
+        self._db.execute("DELETE FROM entries")
+        self._db.executemany(
+            "INSERT INTO entries (row, query, response, created, expires) VALUES (?, ?, ?, ?, ?)",
+            [(new_row, *entries[int(row)]) for new_row, row in enumerate(live)]
+        )
+        self._db.commit()
+        self.expires = self.expires[live].copy()
+        self.stats["compactions"] += 1
+
+    @staticmethod
+    def _digest(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+    def _log(self, query: str, matched: str, similarity: float, hit: bool) -> None:
+        if self.log_path is None:
+            return
+
+        record = {
+            "timestamp": datetime.now().isoformat(),
+            "query": self._digest(query),
+            "matched": self._digest(matched),
+            "similarity": round(similarity, 4),
+            "threshold": self.threshold,
+            "hit": hit
+        }
+        try:
+            with self.log_path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"Semantic cache log error: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self.store.truncate(0)
+            self._db.execute("DELETE FROM entries")
+            self._db.commit()
+            self.expires = np.zeros(0, dtype=np.float64)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self),
+            "threshold": self.threshold,
+            "hit_rate": round(self.stats["hits"] / lookups * 100, 1) if lookups else 0.0
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from cache_codec import FLAG_ZLIB, HEADER, MAGIC, VERSION, CacheCodec
+
+ANSWER = "RTX 4090 yaklaşık 450 watt çeker, sistem için en az 850 watt güç kaynağı önerilir. " * 4
+
+def test_round_trip_with_nested_structures():
+    value = {
+        "final": ANSWER,
+        "gemma": ANSWER,
+        "sources": [
+            {"title": "Donanım", "body": ANSWER, "summary": ANSWER, "tags": ["gpu", "güç"]},
+            {"title": "Boş", "body": "", "scores": [0.5, 1, None, True]}
+        ],
+        "meta": {"model": "qwen", "nested": {"copy": ANSWER, "again": ANSWER}}
+    }
+    codec = CacheCodec()
+
+    payload = codec.encode(value)
+    assert payload.startswith(MAGIC)
+    assert codec.decode(payload) == value
+    assert codec.stats["encoded"] == 1 and codec.stats["decoded"] == 1
+
+def test_repeated_fields_are_stored_once():
+    codec = CacheCodec(compress_threshold=10 ** 9)
+    value = {"llama": ANSWER, "final": ANSWER}
+
+    payload = codec.encode(value)
+    assert payload[HEADER.size:].decode("utf-8").count(ANSWER) == 1
+    assert codec.decode(payload) == value
+
+def test_small_body_stays_uncompressed():
+    codec = CacheCodec(compress_threshold=512)
+    value = {"answer": "Ankara"}
+
+    payload = codec.encode(value)
+    magic, version, flags = HEADER.unpack_from(payload)
+    assert (magic, version, flags) == (MAGIC, VERSION, 0)
+    assert json.loads(payload[HEADER.size:]) == value
+    assert codec.decode(payload) == value
+
+def test_large_body_is_compressed():
+    codec = CacheCodec(compress_threshold=512)
+    value = [{"body": f"{i}. {ANSWER}"} for i in range(20)]
+
+    payload = codec.encode(value)
+    assert HEADER.unpack_from(payload)[2] & FLAG_ZLIB
+    assert len(payload) < len(json.dumps(value).encode("utf-8"))
+    assert codec.decode(payload) == value
+    assert codec.get_stats()["bytes_saved"] > 0
+
+@pytest.mark.parametrize("legacy", [
+    json.dumps({"final": "Ankara"}),
+    json.dumps({"final": "Ankara"}).encode("utf-8")
+])
+def test_legacy_json_payload_is_decoded(legacy):
+    codec = CacheCodec()
+    assert codec.decode(legacy) == {"final": "Ankara"}
+    assert codec.stats["legacy_decoded"] == 1
+
+def test_unknown_version_raises():
+    codec = CacheCodec()
+    payload = codec.encode({"final": "Ankara"})
+    future = HEADER.pack(MAGIC, VERSION + 1, 0) + payload[HEADER.size:]
+
+    with pytest.raises(ValueError):
+        codec.decode(future)
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import pytest
+
+from config import SEARCH_DEDUPE_THRESHOLD
+from context_compressor import SNIPPET_OVERHEAD, ContextCompressor, format_snippet
+from passage_index import estimate_tokens
+
+WORDS = ("ekran kartı güç kaynağı işlemci bellek anakart soğutma kasa fan sürücü monitör klavye fare "
+         "kablo adaptör pil şarj batarya lisans güncelleme sıcaklık voltaj frekans çekirdek").split()
+
+def filler(count: int, offset: int = 0) -> str:
+    return " ".join(WORDS[(i * 7 + offset) % len(WORDS)] + str(i) for i in range(count))
+
+def used_tokens(snippets) -> int:
+    return sum(estimate_tokens(format_snippet(snippet)) + SNIPPET_OVERHEAD for snippet in snippets)
+
+def test_near_duplicates_are_removed_at_configured_threshold():
+    body = "RTX 4090 yaklaşık 450 watt çeker ve 850 watt güç kaynağı önerilir. " + filler(40)
+    snippets = [
+        {"title": "Donanım", "body": body},
+        {"title": "Donanım", "body": body.replace("önerilir", "tavsiye edilir")},
+        {"title": "Başka", "body": filler(40, offset=3)}
+    ]
+    compressor = ContextCompressor(max_tokens=2000, threshold=SEARCH_DEDUPE_THRESHOLD)
+
+    selected = compressor.compress("RTX 4090 güç kaynağı", snippets)
+    assert [snippet["title"] for snippet in selected] == ["Donanım", "Başka"]
+    assert compressor.stats["duplicates"] == 1
+
+def test_snippets_are_ranked_against_the_query():
+    snippets = [
+        {"title": "Kahve", "body": "Kahve ölçülü tüketildiğinde sağlıklıdır."},
+        {"title": "Everest", "body": "Everest dağı 8.849 metredir, Everest zirvesi Nepal sınırındadır."},
+        {"title": "Dağlar", "body": "Türkiye'nin en yüksek dağı Ağrı dağıdır."}
+    ]
+    selected = ContextCompressor(max_tokens=2000).compress("Everest dağı kaç metre", snippets)
+    assert [snippet["title"] for snippet in selected] == ["Everest", "Dağlar", "Kahve"]
+
+def test_output_stays_within_token_budget():
+    snippets = [{"title": f"Kaynak {i}", "body": filler(120, offset=i)} for i in range(5)]
+    compressor = ContextCompressor(max_tokens=300)
+
+    selected = compressor.compress("ekran kartı", snippets)
+    assert selected and used_tokens(selected) <= 300
+    assert compressor.stats["trimmed"] > 0
+    assert all(snippet["body"].endswith(" …") for snippet in selected if snippet not in snippets)
+
+@pytest.mark.parametrize("title_words", [5, 12, 20, 40, 80])
+def test_long_title_does_not_overrun_budget(title_words):
+    snippets = [
+        {"title": filler(title_words, offset=1), "body": filler(150, offset=2)},
+        {"title": filler(title_words, offset=5), "body": filler(150, offset=6)}
+    ]
+    for max_tokens in range(60, 320, 7):
+        selected = ContextCompressor(max_tokens=max_tokens).compress("ekran kartı", snippets)
+        assert used_tokens(selected) <= max_tokens
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import json
+
+from conversation_log import ConversationLog
+
+def entries(count: int, start: int = 0) -> list[dict]:
+    return [{"user": f"soru {i}", "final": f"cevap {i}"} for i in range(start, start + count)]
+
+def test_append_and_read_back(tmp_path):
+    log = ConversationLog(tmp_path / "log", segment_entries=4)
+    assert log.append_many(entries(10)) == 0
+    assert log.append({"user": "son"}) == 10
+
+    assert len(log) == 11
+    assert log.get(6)["user"] == "soru 6"
+    assert log.get(11) is None
+    assert [entry["user"] for entry in log.iter_entries(8)] == ["soru 8", "soru 9", "son"]
+    log.close()
+
+def test_reopen_keeps_entries(tmp_path):
+    log = ConversationLog(tmp_path / "log", segment_entries=4)
+    log.append_many(entries(7))
+    log.close()
+
+    reopened = ConversationLog(tmp_path / "log", segment_entries=4)
+    assert len(reopened) == 7
+    assert reopened.append({"user": "yeni"}) == 7
+    assert reopened.get(7)["user"] == "yeni"
+    reopened.close()
+
+def test_torn_tail_is_truncated_on_open(tmp_path):
+    log = ConversationLog(tmp_path / "log", segment_entries=100)
+    log.append_many(entries(3))
+    log.close()
+
+    data_path = tmp_path / "log" / "seg_000000.jsonl"
+    with data_path.open("ab") as f:
+        f.write(b'{"user": "yar')
+
+    recovered = ConversationLog(tmp_path / "log", segment_entries=100)
+    assert len(recovered) == 3
+    recovered.append({"user": "sonraki"})
+    assert recovered.get(3)["user"] == "sonraki"
+    assert all(json.loads(line) for line in data_path.read_bytes().splitlines())
+    recovered.close()
+
+def test_index_ahead_of_data_is_repaired(tmp_path):
+    log = ConversationLog(tmp_path / "log", segment_entries=100)
+    log.append_many(entries(5))
+    log.close()
+
+    data_path = tmp_path / "log" / "seg_000000.jsonl"
+    lines = data_path.read_bytes().splitlines(keepends=True)
+    data_path.write_bytes(b"".join(lines[:3]))
+
+    recovered = ConversationLog(tmp_path / "log", segment_entries=100)
+    assert len(recovered) == 3
+    assert recovered.get(2)["user"] == "soru 2"
+    recovered.close()
+
+def test_compaction_archives_cold_segments(tmp_path):
+    log = ConversationLog(tmp_path / "log", segment_entries=2, hot_segments=1)
+    log.append_many(entries(9))
+    log.close()
+
+    reopened = ConversationLog(tmp_path / "log", segment_entries=2, hot_segments=1)
+    reopened.compact()
+    assert (tmp_path / "log" / "seg_000000.arc").exists()
+    assert not (tmp_path / "log" / "seg_000000.jsonl").exists()
+    assert [entry["user"] for entry in reopened.iter_entries()] == [f"soru {i}" for i in range(9)]
+    assert reopened.get(1)["user"] == "soru 1"
+    reopened.close()
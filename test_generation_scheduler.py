@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from generation_scheduler import GenerationScheduler
+
+METRICS = {"eval_count": 100, "eval_duration": 2e9}
+
+def test_fixed_policy_gives_every_request_all_threads():
+    scheduler = GenerationScheduler(total_threads=8, max_active=2)
+
+    async def scenario():
+        async with scheduler.slot() as lone:
+            assert lone.threads == 8
+        async with scheduler.slot() as first, scheduler.slot() as second, scheduler.slot() as third:
+            return [lease.threads for lease in (first, second, third)]
+
+    assert scheduler.policy == "fixed"
+    assert asyncio.run(scenario()) == [8, 8, 8]
+    assert scheduler.stats["queued"] == 0
+
+def test_partition_policy_uses_one_static_thread_count():
+    scheduler = GenerationScheduler(total_threads=8, max_active=2, policy="partition")
+
+    async def scenario():
+        order = []
+
+        async def job(name: str):
+            async with scheduler.slot() as lease:
+                order.append((name, lease.threads))
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(job(name) for name in "abc"))
+        return order
+
+    assert asyncio.run(scenario()) == [("a", 4), ("b", 4), ("c", 4)]
+    assert scheduler.stats["queued"] == 1
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        GenerationScheduler(total_threads=8, policy="dynamic")
+
+def test_stats_are_saved_periodically_and_reloaded(tmp_path):
+    path = tmp_path / "generation_stats.json"
+    scheduler = GenerationScheduler(total_threads=8, stats_path=path, save_interval=0)
+
+    async def scenario():
+        async with scheduler.slot() as lease:
+            lease.metrics = METRICS
+
+    asyncio.run(scenario())
+    assert json.loads(path.read_text())["configs"]["8t x1"]["tokens"] == 100
+    assert scheduler.get_stats()["best"] == "8t x1"
+    assert scheduler.get_stats()["configs"]["8t x1"]["tokens_per_s"] == 50.0
+
+    reloaded = GenerationScheduler(total_threads=8, stats_path=path)
+    assert reloaded.configs == scheduler.configs
+    assert GenerationScheduler(total_threads=4, stats_path=path).configs == {}
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import threading
+
+from group_writer import GroupCommitWriter
+
+def test_items_are_committed_in_batches():
+    batches = []
+    gate = threading.Event()
+
+    def commit(batch):
+        gate.wait(1)
+        batches.append(list(batch))
+
+    writer = GroupCommitWriter(commit, flush_interval=0.2, max_batch=8)
+    for i in range(20):
+        writer.submit(i)
+    gate.set()
+    writer.flush()
+
+    assert [item for batch in batches for item in batch] == list(range(20))
+    assert len(batches) < 20
+    assert max(len(batch) for batch in batches) <= 8
+    assert writer.stats["items"] == 20
+    writer.close()
+
+def test_commit_errors_do_not_stop_the_writer():
+    seen = []
+
+    def commit(batch):
+        if "bad" in batch:
+            raise ValueError("boom")
+        seen.extend(batch)
+
+    writer = GroupCommitWriter(commit, flush_interval=0.0)
+    writer.submit("bad")
+    writer.flush()
+    writer.submit("good")
+    writer.flush()
+
+    assert seen == ["good"]
+    assert writer.stats["errors"] == 1
+    writer.close()
+
+def test_close_drains_queue_and_later_writes_commit_inline():
+    seen = []
+    writer = GroupCommitWriter(seen.extend, flush_interval=0.5)
+    for i in range(5):
+        writer.submit(i)
+    writer.close()
+    assert seen == list(range(5))
+
+    writer.submit(5)
+    assert writer.try_submit(6)
+    assert seen == list(range(7))
+
+def test_try_submit_reports_full_queue():
+    gate = threading.Event()
+    writer = GroupCommitWriter(lambda batch: gate.wait(1), flush_interval=0.0, max_batch=1, max_pending=1)
+    writer.submit(0)
+    while writer.pending():
+        pass
+    assert writer.try_submit(1)
+    assert not writer.try_submit(2)
+    gate.set()
+    writer.close()
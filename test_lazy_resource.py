@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from lazy_resource import LazyResource
+
+def test_get_async_keeps_event_loop_free_while_building():
+    calls = []
+
+    def build():
+        calls.append(1)
+        time.sleep(0.2)
+        return "hafıza"
+
+    resource = LazyResource("Memory", build)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while not resource.ready.is_set():
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        results = await asyncio.gather(resource.get_async(), resource.get_async(), ticker())
+        return results[:2], ticks
+
+    results, ticks = asyncio.run(scenario())
+    assert results == ["hafıza", "hafıza"]
+    assert calls == [1]
+    assert ticks >= 5
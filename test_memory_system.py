@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import hashlib
+
+import numpy as np
+import pytest
+
+import memory_system
+from lexical_index import BM25Index
+from memory_system import ConversationMemory
+
+CONVERSATIONS = [
+    ("RTX 4090 ekran kartı kaç watt çeker?", "RTX 4090 yaklaşık 450 watt çeker, RTX 4090 için 850 watt güç kaynağı önerilir."),
+    ("Ankara'nın nüfusu ne kadar?", "Ankara'nın nüfusu yaklaşık 5,8 milyondur."),
+    ("Python'da liste nasıl sıralanır?", "sorted() fonksiyonu ya da list.sort() metodu kullanılır."),
+    ("Kahve mi çay mı daha sağlıklı?", "İkisi de ölçülü tüketildiğinde sağlıklıdır."),
+    ("Everest dağı kaç metre?", "Everest 8.849 metredir.")
+]
+
+class StubEmbedder:
+    def __init__(self, model_name: str, precision: str = "float32"):
+        self.name = model_name
+        self.dim = 16
+
+    def encode(self, texts):
+        vectors = np.stack([
+            np.frombuffer(hashlib.sha256(text.encode("utf-8")).digest()[:16], dtype=np.uint8).astype(np.float32) - 127.5
+            for text in texts
+        ])
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+@pytest.fixture
+def memory(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_system, "EmbeddingBackend", StubEmbedder)
+    memory = ConversationMemory(str(tmp_path / "memory.jsonl"))
+    for user, answer in CONVERSATIONS:
+        memory.add_conversation(user, answer, answer, answer)
+    memory.flush()
+    yield memory
+    memory.close()
+
+def test_exact_term_query_skips_the_embedder(memory, monkeypatch):
+    def fail(texts):
+        raise AssertionError(f"encode called for {texts}")
+
+    monkeypatch.setattr(memory, "_encode", fail)
+    context = memory.search_relevant_context("RTX 4090")
+    assert "450 watt" in context
+
+def test_unmatched_query_falls_back_to_vectors(memory, monkeypatch):
+    calls = []
+    encode = memory._encode
+
+    def counting(texts):
+        calls.append(texts)
+        return encode(texts)
+
+    monkeypatch.setattr(memory, "_encode", counting)
+    memory.search_relevant_context("Mars'a yolculuk ne kadar sürer?")
+    assert calls == [["Mars'a yolculuk ne kadar sürer?"]]
+
+def test_reference_score_counts_unknown_terms(tmp_path):
+    index = BM25Index(tmp_path / "test.bm25")
+    index.add(text for _, text in CONVERSATIONS)
+
+    ids, scores = index.search("RTX 4090", 1)
+    assert scores[0] / index.reference_score("RTX 4090") >= 0.8
+
+    ids, scores = index.search("RTX 4090 fiyatı", 1)
+    assert scores[0] / index.reference_score("RTX 4090 fiyatı") < 0.8
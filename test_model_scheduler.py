@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import asyncio
+
+from model_scheduler import BackendSchedulers, ModelAffinityScheduler
+
+async def run_jobs(scheduler, models: list[str], duration: float = 0.01) -> list[str]:
+    order = []
+
+    async def job(model: str):
+        async with scheduler.slot(model):
+            order.append(model)
+            await asyncio.sleep(duration)
+
+    await asyncio.gather(*(job(model) for model in models))
+    return order
+
+def test_batches_requests_for_the_active_model():
+    scheduler = ModelAffinityScheduler(max_concurrent=2, max_wait=5.0)
+    order = asyncio.run(run_jobs(scheduler, ["qwen", "gemma", "qwen", "gemma", "qwen"]))
+
+    assert order == ["qwen", "qwen", "qwen", "gemma", "gemma"]
+    assert scheduler.stats["switches"] == 1
+
+def test_separate_backends_do_not_serialize_models():
+    endpoints = {"qwen": ["http://a/api/chat"], "gemma": ["http://b/api/chat"]}
+    schedulers = BackendSchedulers(lambda model: endpoints[model], max_concurrent=1, max_wait=5.0)
+
+    async def scenario():
+        running = set()
+        overlap = False
+
+        async def job(model: str):
+            nonlocal overlap
+            async with schedulers.slot(model):
+                running.add(model)
+                await asyncio.sleep(0.02)
+                overlap = overlap or running == {"qwen", "gemma"}
+                running.discard(model)
+
+        await asyncio.gather(job("qwen"), job("gemma"))
+        return overlap
+
+    assert asyncio.run(scenario())
+    assert schedulers.scheduler("qwen") is not schedulers.scheduler("gemma")
+    assert all(stats["switches"] == 0 for stats in schedulers.get_stats().values())
+
+def test_shared_backend_uses_one_scheduler():
+    schedulers = BackendSchedulers(lambda model: ["http://b/api/chat", "http://a/api/chat"])
+    assert schedulers.scheduler("qwen") is schedulers.scheduler("gemma")
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from ollama_client import OllamaClientPool, OllamaStatusError
+from ollama_router import OllamaRouter, parse_model_endpoints
+
+class StandIn:
+    def __init__(self, name: str, models=("qwen:latest", "gemma:latest")):
+        self.name = name
+        self.models = list(models)
+        self.status = 200
+        self.fail_after = None
+        self.requests = []
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if stand_in.status != 200:
+                    return self._send(stand_in.status, b"{}")
+                self._send(200, json.dumps({"models": [{"name": name} for name in stand_in.models]}).encode())
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stand_in.requests.append(payload["model"])
+                if stand_in.status != 200:
+                    return self._send(stand_in.status, b"{}")
+                chunks = [{"message": {"content": word}, "done": False} for word in (stand_in.name, " cevap")]
+                chunks.append({"message": {"content": ""}, "done": True})
+                if not payload.get("stream"):
+                    return self._send(200, json.dumps({"message": {"content": stand_in.name}, "done": True}).encode())
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                if stand_in.fail_after is not None:
+                    self.send_header("Content-Length", "4096")
+                self.end_headers()
+                for i, chunk in enumerate(chunks):
+                    if stand_in.fail_after is not None and i == stand_in.fail_after:
+                        self.connection.shutdown(socket.SHUT_RDWR)
+                        return
+                    self.wfile.write(json.dumps(chunk).encode() + b"\n")
+                    self.wfile.flush()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/chat"
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def nodes():
+    created = [StandIn("a"), StandIn("b")]
+    yield created
+    for node in created:
+        node.close()
+
+def closed_url() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/api/chat"
+
+def make_router(endpoints, model_endpoints=None) -> OllamaRouter:
+    pool = OllamaClientPool(endpoints[0], connect_timeout=1.0, first_token_timeout=5.0, idle_timeout=5.0)
+    return OllamaRouter(pool, endpoints, model_endpoints=model_endpoints, health_interval=0, retry_after=60.0)
+
+async def stream_text(router: OllamaRouter, model: str) -> str:
+    payload = {"model": model, "messages": [{"role": "user", "content": "merhaba"}]}
+    return "".join([data["message"]["content"] async for data in router.chat_stream(payload)])
+
+def run(router: OllamaRouter, scenario):
+    async def main():
+        try:
+            return await scenario()
+        finally:
+            await router.aclose()
+            await router.pool.aclose()
+    return asyncio.run(main())
+
+def test_parse_model_endpoints():
+    spec = "qwen=http://a/api/chat, http://b/api/chat; gemma=http://c/api/chat;bozuk"
+    assert parse_model_endpoints(spec) == {
+        "qwen": ["http://a/api/chat", "http://b/api/chat"],
+        "gemma": ["http://c/api/chat"]
+    }
+
+def test_stream_fails_over_before_first_token(nodes):
+    a, b = nodes
+    a.status = 500
+    router = make_router([a.url, b.url])
+
+    assert run(router, lambda: stream_text(router, "qwen")) == "b cevap"
+    assert router.stats["failovers"] == 1
+    assert not router.backends[a.url].healthy
+    assert router.backends[b.url].healthy
+
+def test_unreachable_backend_fails_over(nodes):
+    _, b = nodes
+    down = closed_url()
+    router = make_router([down, b.url])
+
+    async def scenario():
+        first = await router.chat({"model": "qwen", "messages": []})
+        second = await router.chat({"model": "qwen", "messages": []})
+        return first["message"]["content"], second["message"]["content"]
+
+    assert run(router, scenario) == ("b", "b")
+    assert router.stats["failovers"] == 1
+    assert not router.backends[down].healthy
+
+def test_stream_does_not_fail_over_after_first_token(nodes):
+    a, b = nodes
+    a.fail_after = 1
+    router = make_router([a.url, b.url])
+
+    async def scenario():
+        received = []
+        payload = {"model": "qwen", "messages": []}
+        with pytest.raises(httpx.TransportError):
+            async for data in router.chat_stream(payload):
+                received.append(data["message"]["content"])
+        return received
+
+    assert run(router, scenario) == ["a"]
+    assert router.stats["failovers"] == 0
+    assert b.requests == []
+
+def test_client_errors_are_not_retried(nodes):
+    a, b = nodes
+    a.status = 400
+    router = make_router([a.url, b.url])
+
+    with pytest.raises(OllamaStatusError):
+        run(router, lambda: router.chat({"model": "qwen", "messages": []}))
+    assert b.requests == []
+    assert router.backends[a.url].healthy
+
+def test_model_pinning_routes_to_configured_node(nodes):
+    a, b = nodes
+    router = make_router([a.url], model_endpoints={"gemma": [b.url]})
+
+    async def scenario():
+        for _ in range(3):
+            await stream_text(router, "gemma")
+            await stream_text(router, "qwen")
+
+    run(router, scenario)
+    assert b.requests == ["gemma"] * 3
+    assert a.requests == ["qwen"] * 3
+
+def test_probe_marks_backend_down_and_back_up(nodes):
+    a, b = nodes
+    a.models = ["gemma:latest"]
+    router = make_router([a.url, b.url])
+
+    async def scenario():
+        a.status = 503
+        assert await router.probe_all() == {a.url: False, b.url: True}
+        assert [backend.url for backend in router.candidates("gemma")] == [b.url]
+
+        a.status = 200
+        assert await router.probe_all() == {a.url: True, b.url: True}
+        assert [backend.url for backend in router.candidates("qwen")] == [b.url]
+        assert {backend.url for backend in router.candidates("gemma")} == {a.url, b.url}
+
+    run(router, scenario)
+    assert router.backends[a.url].failures == 0
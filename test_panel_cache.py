@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+import multi_agent_streaming
+from cache_manager import CacheManager
+from lazy_resource import LazyResource
+from multi_agent_streaming import MultiModelOrchestrator
+
+class FakeMemory:
+    def __init__(self):
+        self.entries = []
+
+    def search_relevant_context(self, query: str) -> str:
+        return "\n".join(f"Response: {entry['final_answer']}" for entry in self.entries if entry["user_msg"] == query)
+
+    async def add_conversation_async(self, **entry) -> None:
+        self.entries.append(entry)
+
+@pytest.fixture
+def panel(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    memory = FakeMemory()
+    monkeypatch.setattr(multi_agent_streaming, "MEMORY", LazyResource("Memory", lambda: memory))
+    monkeypatch.setattr(multi_agent_streaming, "CACHE", LazyResource("Cache", lambda: CacheManager(use_redis=False)))
+    monkeypatch.setattr(multi_agent_streaming, "SEMANTIC_CACHE_ENABLED", False)
+
+    async def no_search(query, max_results=5, max_tokens=None, refresh=False):
+        return "", []
+
+    monkeypatch.setattr(multi_agent_streaming, "search_context", no_search)
+    orchestrator = MultiModelOrchestrator()
+    yield orchestrator, memory
+    multi_agent_streaming.CACHE.get().close()
+
+def test_gemma_failure_is_not_persisted_and_retry_reuses_qwen_stage(panel, monkeypatch):
+    orchestrator, memory = panel
+    calls = {"qwen": 0, "gemma": 0}
+    gemma_replies = iter(["[Hata] Sunucu: 500", "Katılıyorum. Haklılık Payı: %70"])
+
+    async def qwen_think(msg, temp_override=0.0):
+        calls["qwen"] += 1
+        return "Ankara Türkiye'nin başkentidir."
+
+    async def gemma_think(msg, temp_override=0.0):
+        calls["gemma"] += 1
+        return next(gemma_replies)
+
+    monkeypatch.setattr(orchestrator.llama_chat, "think", qwen_think)
+    monkeypatch.setattr(orchestrator.gemma_chat, "think", gemma_think)
+
+    async def scenario():
+        failed = await orchestrator.ask_panel_async("Türkiye'nin başkenti neresi?")
+        retried = await orchestrator.ask_panel_async("Türkiye'nin başkenti neresi?")
+        return failed, retried
+
+    failed, retried = asyncio.run(scenario())
+    assert failed["final"].startswith("[Hata]")
+    assert "Haklılık Payı" in retried["final"]
+    assert calls == {"qwen": 1, "gemma": 2}
+    assert len(memory.entries) == 1
+    assert not any("[Hata]" in value for entry in memory.entries for value in entry.values())
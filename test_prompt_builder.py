@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from passage_index import estimate_tokens
+from prompt_builder import MESSAGE_OVERHEAD, PromptBuilder, PromptSection, trim_to_tokens
+
+TURKISH = "Yapay zekâ öğretmenlerin rolünü değiştiriyor, öğrencilere kişiselleştirilmiş geri bildirim sağlıyor. "
+
+def messages(user: str, system: str = "Sen yardımcı bir asistansın.") -> list[dict]:
+    return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+
+def worst_case_tokens(items: list[dict]) -> int:
+    return sum(len(item["content"]) // 3 + MESSAGE_OVERHEAD for item in items)
+
+def test_estimate_is_conservative_for_turkish_text():
+    assert estimate_tokens(TURKISH) >= len(TURKISH) / 3
+    assert estimate_tokens("") == 1
+
+def test_num_ctx_is_pinned_for_every_prompt_size():
+    builder = PromptBuilder(max_ctx=4096, num_predict=500)
+    small = builder.options_for(messages("merhaba"))
+    large = builder.options_for(messages(TURKISH * 60))
+
+    assert small["num_ctx"] == large["num_ctx"] == 4096
+    assert small["num_predict"] == 500
+
+def test_built_prompt_plus_prediction_fits_the_window():
+    builder = PromptBuilder(max_ctx=2048, num_predict=500, headroom=128)
+    system = "Sen yardımcı bir asistansın."
+    prompt = builder.build([
+        PromptSection("memory", TURKISH * 40, priority=2),
+        PromptSection("search", TURKISH * 40, priority=1),
+        PromptSection("question", "KULLANICI SORUSU: Yapay zekâ eğitimi nasıl etkiler?", required=True)
+    ], reserved_tokens=estimate_tokens(system))
+
+    request = messages(prompt, system)
+    options = builder.options_for(request)
+    assert options["num_predict"] == 500
+    assert worst_case_tokens(request) + options["num_predict"] <= 2048
+    assert builder.stats["sections_trimmed"] + builder.stats["sections_dropped"] > 0
+
+def test_prediction_is_clamped_at_the_boundary():
+    builder = PromptBuilder(max_ctx=2048, num_predict=500, min_predict=128, headroom=128)
+    base = builder.options_for(messages(""))
+    fixed = sum(estimate_tokens(item["content"]) + MESSAGE_OVERHEAD for item in messages(""))
+    assert base["num_predict"] == 500
+
+    room = builder.usable_ctx - 500 - fixed + 1
+    fits = builder.options_for(messages("a" * 3 * room))
+    assert fits["num_predict"] == 500
+
+    over = builder.options_for(messages("a" * 3 * (room + 100)))
+    assert over["num_predict"] == 400
+    assert builder.stats["overflows"] == 0
+
+    builder.options_for(messages("a" * 3 * builder.usable_ctx))
+    assert builder.stats["overflows"] == 1
+
+def test_trim_to_tokens_respects_the_estimate():
+    trimmed = trim_to_tokens(TURKISH * 20, 100)
+    assert estimate_tokens(trimmed) <= 101
+    assert trimmed.endswith("…")
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+
+from semantic_cache import SemanticCache
+
+VECTORS = {
+    "hava nasıl": [1.0, 0.0, 0.0],
+    "hava nasıl olacak": [0.99, 0.14, 0.0],
+    "python nedir": [0.0, 1.0, 0.0]
+}
+
+def encode(texts: list[str]) -> np.ndarray:
+    vectors = np.array([VECTORS.get(text, [0.0, 0.0, 1.0]) for text in texts], dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def make_cache(tmp_path, **kwargs) -> SemanticCache:
+    return SemanticCache(tmp_path / "semantic.sqlite", encode=encode, dim=3, model_name="fake", threshold=0.9,
+                         log_path=tmp_path / "hits.jsonl", **kwargs)
+
+def test_lookup_hits_similar_query(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.add("hava nasıl", {"final": "güneşli"})
+
+    match = cache.lookup("hava nasıl olacak")
+    assert match["response"] == {"final": "güneşli"}
+    assert cache.lookup("python nedir") is None
+    assert cache.get_stats()["hits"] == 1
+    cache.close()
+
+def test_expired_rows_do_not_hide_live_match(tmp_path):
+    cache = make_cache(tmp_path)
+    for _ in range(10):
+        cache.add("hava nasıl", {"final": "eski"}, ttl=-1)
+    cache.add("hava nasıl olacak", {"final": "yeni"})
+
+    assert cache.lookup("hava nasıl")["response"] == {"final": "yeni"}
+    cache.close()
+
+def test_stores_and_logs_no_personal_data(tmp_path):
+    cache = make_cache(tmp_path)
+    question = "ali@example.com adresime yaz"
+    cache.add(question, {"final": "ali@example.com adresine yazıldı"})
+    cache.lookup(question)
+    cache.close()
+
+    stored = (tmp_path / "semantic.sqlite").read_bytes()
+    assert b"ali@example.com" not in stored
+    record = json.loads((tmp_path / "hits.jsonl").read_text(encoding="utf-8"))
+    assert "ali@example.com" not in json.dumps(record)
+    assert record["hit"] is True
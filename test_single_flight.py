@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from single_flight import SharedStream, SingleFlight
+
+def test_single_flight_coalesces_concurrent_calls():
+    async def scenario():
+        flights = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "cevap"
+
+        results = await asyncio.gather(*(flights.run("soru", work) for _ in range(5)))
+        assert results == ["cevap"] * 5
+        assert calls == 1
+        assert flights.stats == {"leaders": 1, "coalesced": 4, "cancelled": 0}
+        assert not flights.in_flight("soru")
+
+    asyncio.run(scenario())
+
+def test_single_flight_shares_errors_and_recovers():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("ollama down")
+
+        results = await asyncio.gather(flights.run("soru", fail), flights.run("soru", fail), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+        async def work():
+            return "tamam"
+
+        assert await flights.run("soru", work) == "tamam"
+        assert flights.stats["leaders"] == 2
+
+    asyncio.run(scenario())
+
+def test_single_flight_cancels_when_last_waiter_leaves():
+    async def scenario():
+        flights = SingleFlight()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def work():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        first = asyncio.ensure_future(flights.run("soru", work))
+        second = asyncio.ensure_future(flights.run("soru", work))
+        await started.wait()
+
+        first.cancel()
+        await asyncio.sleep(0)
+        assert flights.in_flight("soru")
+
+        second.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        assert not flights.in_flight("soru")
+        assert flights.stats["cancelled"] == 1
+
+    asyncio.run(scenario())
+
+def test_shared_stream_replays_chunks_to_late_subscribers():
+    async def scenario():
+        streams = SharedStream()
+        calls = 0
+
+        async def tokens():
+            nonlocal calls
+            calls += 1
+            for token in ("Mer", "ha", "ba"):
+                await asyncio.sleep(0.01)
+                yield token
+
+        async def collect(delay: float):
+            await asyncio.sleep(delay)
+            return [chunk async for chunk in streams.stream("soru", tokens)]
+
+        results = await asyncio.gather(collect(0), collect(0.015))
+        assert results == [["Mer", "ha", "ba"]] * 2
+        assert calls == 1
+        assert streams.stats["coalesced"] == 1
+
+    asyncio.run(scenario())
+
+def test_shared_stream_propagates_errors():
+    async def scenario():
+        streams = SharedStream()
+
+        async def tokens():
+            yield "Mer"
+            raise RuntimeError("bağlantı koptu")
+
+        received = []
+        with pytest.raises(RuntimeError):
+            async for chunk in streams.stream("soru", tokens):
+                received.append(chunk)
+        assert received == ["Mer"]
+
+    asyncio.run(scenario())
+
+def test_shared_stream_cancels_producer_without_subscribers():
+    async def scenario():
+        streams = SharedStream()
+        closed = asyncio.Event()
+
+        async def tokens():
+            try:
+                while True:
+                    await asyncio.sleep(0.01)
+                    yield "token"
+            finally:
+                closed.set()
+
+        stream = streams.stream("soru", tokens)
+        assert await stream.__anext__() == "token"
+        await stream.aclose()
+
+        await asyncio.wait_for(closed.wait(), 1)
+        assert streams.stats["cancelled"] == 1
+
+    asyncio.run(scenario())
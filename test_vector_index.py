@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+
+from embedding_store import EmbeddingStore
+from vector_index import FlatIndex, IVFIndex
+
+def make_vectors(count: int, dim: int = 16, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def make_store(tmp_path, vectors: np.ndarray) -> EmbeddingStore:
+    store = EmbeddingStore(tmp_path / "test.emb", dim=vectors.shape[1], model_name="test")
+    store.append(vectors)
+    return store
+
+def test_ivf_finds_exact_match(tmp_path):
+    vectors = make_vectors(400)
+    index = IVFIndex(make_store(tmp_path, vectors), tmp_path / "test.idx", n_probe=20, min_train=1)
+
+    ids, scores = index.search(vectors[123], 1)
+    assert ids[0] == 123
+    assert scores[0] > 0.99
+
+def test_ivf_matches_flat_with_all_lists_probed(tmp_path):
+    vectors = make_vectors(300)
+    store = make_store(tmp_path, vectors)
+    index = IVFIndex(store, tmp_path / "test.idx", min_train=1)
+    index.n_probe = len(index.centroids)
+
+    query = make_vectors(1, seed=1)[0]
+    ivf_ids, _ = index.search(query, 5)
+    flat_ids, _ = FlatIndex(store).search(query, 5)
+    assert list(ivf_ids) == list(flat_ids)
+
+def test_ivf_reloads_and_truncates(tmp_path):
+    vectors = make_vectors(200)
+    store = make_store(tmp_path, vectors)
+    trained = IVFIndex(store, tmp_path / "test.idx", min_train=1)
+
+    store = EmbeddingStore(tmp_path / "test.emb", dim=16, model_name="test")
+    reloaded = IVFIndex(store, tmp_path / "test.idx", min_train=1)
+    assert np.array_equal(reloaded.centroids, trained.centroids)
+    assert len(reloaded.assignments) == 200
+
+    reloaded.truncate(150)
+    reloaded.n_probe = len(reloaded.centroids)
+    ids, _ = reloaded.search(vectors[180], 200)
+    assert ids.max() < 150
+
+def test_ivf_reload_after_store_truncate_keeps_lists_aligned(tmp_path):
+    vectors = make_vectors(100)
+    store = make_store(tmp_path, vectors)
+    IVFIndex(store, tmp_path / "test.idx", min_train=1)
+
+    store = EmbeddingStore(tmp_path / "test.emb", dim=16, model_name="test")
+    store.truncate(90)
+    index = IVFIndex(store, tmp_path / "test.idx", min_train=1)
+    assert not store.rebuilt and len(index.assignments) == 90
+    more = make_vectors(10, seed=1)
+    store.append(more)
+    index.add(90, more)
+
+    store = EmbeddingStore(tmp_path / "test.emb", dim=16, model_name="test")
+    reloaded = IVFIndex(store, tmp_path / "test.idx", min_train=1)
+    assert len(np.fromfile(tmp_path / "test.idx.lists", dtype=np.int32)) == 100
+    assert np.array_equal(reloaded.assignments, index.assignments)
+    assert np.array_equal(reloaded.assignments[90:], IVFIndex._assign(more, reloaded.centroids))
+
+    reloaded.n_probe = len(reloaded.centroids)
+    ids, _ = reloaded.search(more[5], 1)
+    assert ids[0] == 95
+
+def test_search_during_retrain_sees_consistent_snapshot(tmp_path):
+    vectors = make_vectors(64)
+    store = make_store(tmp_path, vectors)
+    index = IVFIndex(store, tmp_path / "test.idx", n_probe=4, min_train=1)
+
+    errors = []
+    stop = threading.Event()
+
+    def searcher():
+        query = vectors[0]
+        while not stop.is_set():
+            try:
+                index.search(query, 3)
+            except Exception as e:
+                errors.append(e)
+                return
+
+    thread = threading.Thread(target=searcher)
+    thread.start()
+    try:
+        for i in range(3):
+            more = make_vectors(len(store) * 4, seed=i + 1)
+            start = len(store)
+            store.append(more)
+            index.add(start, more)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert not errors
+    assert len(index.assignments) == len(store)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from file_cache import SQLiteCache
+from web_search import CachedSearch, FakeSearchProvider, SearchProvider, create_search_provider, normalize_query
+
+RESULTS = {
+    "İstanbul hava durumu": [
+        {"title": "Hava", "body": "İstanbul'da yarın yağmur bekleniyor.", "href": "https://example.com/1"},
+        {"title": "Tahmin", "body": "Hafta sonu güneşli.", "href": "https://example.com/2"}
+    ]
+}
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SQLiteCache(tmp_path / "search.sqlite", sweep_interval=3600)
+    yield cache
+    cache.close()
+
+def test_normalize_query_folds_case_and_punctuation():
+    assert normalize_query("  İSTANBUL   Hava durumu?! ") == "istanbul hava durumu"
+    assert normalize_query("ISPARTA") == normalize_query("ısparta")
+
+def test_search_provider_is_abstract():
+    with pytest.raises(TypeError):
+        SearchProvider()
+
+def test_repeated_query_is_served_from_cache(cache):
+    provider = FakeSearchProvider(RESULTS)
+    search = CachedSearch(provider, cache=cache)
+
+    results, from_cache = search.search("İstanbul hava durumu", 5)
+    assert len(results) == 2 and not from_cache
+
+    results, from_cache = search.search("istanbul   HAVA durumu?", 5)
+    assert len(results) == 2 and from_cache
+    assert provider.queries == ["İstanbul hava durumu"]
+    assert search.stats["hits"] == 1 and search.stats["misses"] == 1
+
+def test_refresh_bypasses_cache(cache):
+    provider = FakeSearchProvider(RESULTS)
+    search = CachedSearch(provider, cache=cache)
+
+    search.search("İstanbul hava durumu", 5)
+    _, from_cache = search.search("İstanbul hava durumu", 5, refresh=True)
+    assert not from_cache
+    assert len(provider.queries) == 2
+
+def test_empty_results_use_negative_ttl(cache):
+    provider = FakeSearchProvider(RESULTS)
+    search = CachedSearch(provider, cache=cache, ttl=3600, negative_ttl=0.2)
+
+    assert search.search("bilinmeyen konu", 5) == ([], False)
+    assert search.search("Bilinmeyen konu", 5) == ([], True)
+    assert search.stats["negative_hits"] == 1
+
+    time.sleep(0.3)
+    assert search.search("bilinmeyen konu", 5) == ([], False)
+    assert len(provider.queries) == 2
+
+def test_provider_errors_are_not_cached(cache):
+    class FailingProvider(SearchProvider):
+        name = "failing"
+        calls = 0
+
+        def search(self, query, max_results):
+            self.calls += 1
+            raise ConnectionError("ddg erişilemiyor")
+
+    provider = FailingProvider()
+    search = CachedSearch(provider, cache=cache)
+    assert search.search("soru", 5) == ([], False)
+    assert search.search("soru", 5) == ([], False)
+    assert provider.calls == 2
+    assert search.stats["errors"] == 2
+
+def test_create_search_provider():
+    assert isinstance(create_search_provider("fake"), FakeSearchProvider)
+    with pytest.raises(ValueError):
+        create_search_provider("bing")
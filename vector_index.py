@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from embedding_store import EmbeddingStore
+
+class FlatIndex:
+    kind = "flat"
+
+    def __init__(self, store: EmbeddingStore):
+        self.store = store
+
+    def add(self, start_id: int, vectors: np.ndarray) -> None:
+        pass
+
+    def truncate(self, rows: int) -> None:
+        pass
+
+    def search(self, query: np.ndarray, top_k: int, min_id: int = 0) -> tuple[np.ndarray, np.ndarray]:
+        return self.store.search(query, top_k, start=min_id)
+
+class IVFIndex:
+    kind = "ivf"
+
+    def __init__(self, store: EmbeddingStore, path: Path, n_probe: int = 8, min_train: int = 2048):
+        self.store = store
+        self.path = Path(path)
+        self.centroids_path = self.path.with_name(self.path.name + ".centroids.npy")
+        self.lists_path = self.path.with_name(self.path.name + ".lists")
+        self.meta_path = self.path.with_name(self.path.name + ".json")
+        self.n_probe = n_probe
+        self.min_train = min_train
+
+        self.centroids: np.ndarray | None = None
+        self.assignments = np.zeros(0, dtype=np.int32)
+        self.trained_size = 0
+        self._lists: list[np.ndarray] = []
+        self._lock = threading.Lock()
+
+        self._load()
+        self._catch_up()
+
+    def _load(self) -> None:
+        if self.store.rebuilt:
+            return
+        if not (self.centroids_path.exists() and self.lists_path.exists() and self.meta_path.exists()):
+            return
+
+        try:
+            with self.meta_path.open("r", encoding="utf-8") as f:
+                meta = json.load(f)
+            centroids = np.load(self.centroids_path)
+            assignments = np.fromfile(self.lists_path, dtype=np.int32)
+        except Exception as e:
+            print(f"IVF index load error: {e}")
+            return
+
+        if centroids.shape[1] != self.store.dim:
+            return
+
+        self.trained_size = meta.get("trained_size", len(assignments))
+        if len(assignments) > len(self.store):
+            assignments = assignments[:len(self.store)]
+            assignments.tofile(self.lists_path)
+        self._swap(centroids, assignments, self._build_lists(assignments, len(centroids)))
+
+    def _save_meta(self) -> None:
+        with self.meta_path.open("w", encoding="utf-8") as f:
+            json.dump({"trained_size": self.trained_size, "n_lists": len(self.centroids)}, f)
+
+    @staticmethod
+    def _build_lists(assignments: np.ndarray, n_lists: int) -> list[np.ndarray]:
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.searchsorted(assignments[order], np.arange(n_lists + 1))
+        return [order[bounds[i]:bounds[i + 1]] for i in range(n_lists)]
+
+    def _swap(self, centroids: np.ndarray, assignments: np.ndarray, lists: list[np.ndarray]) -> None:
+        with self._lock:
+            self.centroids = centroids
+            self.assignments = assignments
+            self._lists = lists
+
+    def _snapshot(self) -> tuple[np.ndarray | None, list[np.ndarray]]:
+        with self._lock:
+            return self.centroids, self._lists
+
+    def _catch_up(self) -> None:
+        missing = len(self.store) - len(self.assignments)
+        if missing > 0:
+            start = len(self.assignments)
+            self.add(start, self.store.vectors(start))
+
+    def _train(self) -> None:
+        total = len(self.store)
+        n_lists = max(1, int(np.sqrt(total)))
+        rng = np.random.default_rng(0)
+
+        sample_size = min(total, n_lists * 64)
+        sample = self.store.take(np.sort(rng.choice(total, sample_size, replace=False)))
+        centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+
+        for _ in range(10):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = sample[labels == c]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[c] = centroid / (np.linalg.norm(centroid) or 1.0)
+
+        centroids = centroids.astype(np.float32)
+        assignments = np.concatenate([
+            self._assign(self.store.vectors(i, i + 65536), centroids) for i in range(0, total, 65536)
+        ])
+        self.trained_size = total
+        self._swap(centroids, assignments, self._build_lists(assignments, n_lists))
+
+        np.save(self.centroids_path, centroids)
+        assignments.tofile(self.lists_path)
+        self._save_meta()
+
+    @staticmethod
+    def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        labels = np.empty(len(vectors), dtype=np.int32)
+        for i in range(0, len(vectors), 8192):
+            block = np.asarray(vectors[i:i + 8192])
+            labels[i:i + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        return labels
+
+    def add(self, start_id: int, vectors: np.ndarray) -> None:
+        if len(vectors) == 0:
+            return
+
+        if self.centroids is None or len(self.store) >= self.trained_size * 4:
+            if len(self.store) >= self.min_train:
+                self._train()
+            return
+
+        centroids, lists = self._snapshot()
+        labels = self._assign(vectors, centroids)
+        assignments = np.concatenate([self.assignments[:start_id], labels])
+        with self.lists_path.open("ab") as f:
+            f.write(labels.tobytes())
+
+        lists = list(lists)
+        for label in np.unique(labels):
+            new_ids = np.nonzero(labels == label)[0] + start_id
+            lists[label] = np.concatenate([lists[label], new_ids])
+        self._swap(centroids, assignments, lists)
+
+    def truncate(self, rows: int) -> None:
+        if self.centroids is None or rows >= len(self.assignments):
+            return
+
+        assignments = self.assignments[:rows]
+        assignments.tofile(self.lists_path)
+        self._swap(self.centroids, assignments, self._build_lists(assignments, len(self.centroids)))
+
+    def search(self, query: np.ndarray, top_k: int, min_id: int = 0) -> tuple[np.ndarray, np.ndarray]:
+        centroids, lists = self._snapshot()
+        if centroids is None:
+            return self.store.search(query, top_k, start=min_id)
+
+        query = np.asarray(query, dtype=np.float32)
+        n_probe = min(self.n_probe, len(centroids))
+        probe = np.argpartition(-(centroids @ query), n_probe - 1)[:n_probe]
+
+        candidates = np.concatenate([lists[c] for c in probe])
+        candidates = candidates[candidates >= min_id]
+        if len(candidates) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        candidates.sort()
+        scores = self.store.dot_ids(query, candidates)
+        top_k = min(top_k, len(scores))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+
+        return candidates[top], scores[top]
+
+def create_index(kind: str, store: EmbeddingStore, path: Path, **kwargs):
+    if kind == "flat":
+        return FlatIndex(store)
+    if kind == "ivf":
+        return IVFIndex(store, path, **kwargs)
+    raise ValueError(f"Unknown memory index type: {kind}")
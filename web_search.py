@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from file_cache import SQLiteCache
+from lexical_index import TOKEN_PATTERN, TURKISH_LOWER
+
+def normalize_query(query: str) -> str:
+    return " ".join(TOKEN_PATTERN.findall(query.translate(TURKISH_LOWER).lower()))
+
+class SearchProvider(ABC):
+    name = "base"
+
+    @abstractmethod
+    def search(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        ...
+
+class DuckDuckGoProvider(SearchProvider):
+    name = "duckduckgo"
+
+    def __init__(self, region: str = "tr-tr"):
+        self.region = region
+
+    def search(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        from duckduckgo_search import DDGS
+
+        try:
+            return list(DDGS().text(query, max_results=max_results, region=self.region, backend="html") or [])
+        except Exception:
+            return list(DDGS().text(query, max_results=max_results, region=self.region, backend="lite") or [])
+
+class FakeSearchProvider(SearchProvider):
+    name = "fake"
+
+    def __init__(self, results: Optional[Dict[str, List[Dict[str, str]]]] = None):
+        self.results = {normalize_query(query): items for query, items in (results or {}).items()}
+        self.queries: List[str] = []
+
+    @classmethod
+    def from_file(cls, path: Path) -> "FakeSearchProvider":
+        with Path(path).open("r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def search(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        self.queries.append(query)
+        return self.results.get(normalize_query(query), [])[:max_results]
+
+def create_search_provider(name: str, fake_results: Optional[str] = None) -> SearchProvider:
+    if name == "fake":
+        return FakeSearchProvider.from_file(Path(fake_results)) if fake_results else FakeSearchProvider()
+    if name == "duckduckgo":
+        return DuckDuckGoProvider()
+    raise ValueError(f"Unknown search provider: {name}")
+
+class CachedSearch:
+    def __init__(self, provider: SearchProvider, cache: Optional[SQLiteCache] = None,
+                 ttl: float = 3600, negative_ttl: float = 300):
+        self.provider = provider
+        self.cache = cache
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stats = {"hits": 0, "negative_hits": 0, "misses": 0, "errors": 0}
+
+    def _key(self, query: str, max_results: int) -> str:
+        combined = f"{self.provider.name}:{max_results}:{normalize_query(query)}"
+        return hashlib.sha256(combined.encode()).hexdigest()
+
+    def search(self, query: str, max_results: int, refresh: bool = False) -> tuple[List[Dict[str, str]], bool]:
+        key = self._key(query, max_results)
+        if self.cache is not None and not refresh:
+            cached = self.cache.get(key)
+            if cached is not None:
+                results = cached["response"]["results"]
+                self.stats["hits" if results else "negative_hits"] += 1
+                return results, True
+
+        self.stats["misses"] += 1
+        try:
+            results = self.provider.search(query, max_results)
+        except Exception as e:
+            print(f"Search provider error: {e}")
+            self.stats["errors"] += 1
+            return [], False
+
+        if self.cache is not None:
+            self.cache.set(key, {"results": results}, self.ttl if results else self.negative_ttl)
+        return results, False
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {**self.stats, "provider": self.provider.name}
+        if self.cache is not None:
+            stats["cache"] = self.cache.get_stats()
+        return stats
+
+    def close(self) -> None:
+        if self.cache is not None:
+            self.cache.close()